@@ -0,0 +1,56 @@
+"""
+Compares Visor.render() with and without premultiplied=True for semi-transparent sprites.
+
+Run it with SDL_VIDEODRIVER=dummy to benchmark without a window.
+"""
+import random
+import time
+
+import pygame
+
+from pygame_visor import Visor, VisorMode
+
+SPRITES = 2000
+FRAMES = 100
+
+
+def make_sprite(size: int) -> pygame.Surface:
+    sprite = pygame.Surface((size, size), pygame.SRCALPHA)
+    center = size / 2
+    for y in range(size):
+        for x in range(size):
+            distance = ((x - center) ** 2 + (y - center) ** 2) ** 0.5 / center
+            alpha = max(0, int(255 * (1 - distance)))
+            sprite.set_at((x, y), (255, 160 + x % 64, 64, alpha))
+    return sprite.convert_alpha()
+
+
+def measure(view: Visor, screen: pygame.Surface, items, premultiplied: bool) -> float:
+    view.render(screen, items, premultiplied=premultiplied)  # fill the caches
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        screen.fill('black')
+        view.render(screen, items, premultiplied=premultiplied)
+    return (time.perf_counter() - start) / FRAMES * 1000
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    random.seed(123)
+    sprites = [make_sprite(size) for size in (16, 32, 64)]
+    items = [
+        ((random.uniform(0, 400), random.uniform(0, 300)), random.choice(sprites))
+        for _ in range(SPRITES)
+    ]
+
+    for zoom in (1.0, 2.0):
+        view = Visor(VisorMode.RegionLetterbox, screen.get_rect(), region=(0, 0, 800 / zoom, 600 / zoom))
+        regular = measure(view, screen, items, False)
+        premultiplied = measure(view, screen, items, True)
+        print(f'zoom {zoom}: regular {regular:.2f} ms, premultiplied {premultiplied:.2f} ms '
+              f'per frame ({SPRITES} sprites, {regular / premultiplied:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
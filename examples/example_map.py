@@ -1,6 +1,6 @@
 import pygame
 
-from pygame_visor import Visor, VisorMode
+from pygame_visor import Visor, VisorMode, Layer
 from common import App
 
 
@@ -22,12 +22,21 @@ def main():
         limits=app.limits,
     )
 
+    # the minimap tiles are only re-rendered, when the map camera moves (or the layer is invalidated).
+    map_layer = Layer(map_view, lambda bbox: app.get_tiles_for_bbox(app.tiles, bbox), background='black')
+
+    def map_center() -> tuple[int, int]:
+        # move the map camera in steps, so the layer can be reused in between
+        step = 100
+        x, y = app.player_pos.center
+        return round(x / step) * step, round(y / step) * step
+
     view.move_to(app.player_pos.center)
-    map_view.move_to(app.player_pos.center)
+    map_view.move_to(map_center())
 
     for delta in app.loop(60):
         view.lerp_to(app.player_pos.center, 0.1)
-        map_view.move_to(app.player_pos.center)
+        map_view.move_to(map_center())
 
         bbox = view.get_bounding_box()
         view.render(app.screen, app.get_tiles_for_bbox(app.tiles, bbox))
@@ -35,9 +44,7 @@ def main():
             (app.player_pos.topleft, app.player_surf)
         ])
 
-        bbox = map_view.get_bounding_box()
-        map_surface.fill('black')
-        map_view.render(map_surface, app.get_tiles_for_bbox(app.tiles, bbox))
+        map_layer.draw(map_surface)
         map_view.render(map_surface, [
             (app.player_pos.topleft, app.player_surf)
         ])
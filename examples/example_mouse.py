@@ -15,34 +15,27 @@ def main():
     )
 
     view.move_to(app.player_pos.center)
-
-    font = pygame.Font(pygame.font.get_default_font(), 16)
+    picking = view.enable_picking()
 
     for delta in app.loop(60):
         view.move_to(app.player_pos.center)
+        picking.clear()
 
         bbox = view.get_bounding_box()
         view.render(app.screen, app.get_tiles_for_bbox(app.tiles, bbox))
 
         # highlight mouse position
 
-        mouse_pos = pygame.mouse.get_pos()
-        mw_x, mw_y = view.screen_to_world(mouse_pos)
-
-        col, row = app.get_tile((mw_x, mw_y))
-        data = app.tiles.get((col, row))
-        if data is not None:
-            tx, ty, tile_surf = data
-            tmp = tile_surf.copy()
-            tmp.fill((0, 128, 255))
-            view.render(app.screen, [
-                ((tx, ty), tmp)
-            ])
-
-            index_surf = font.render(f'({col}, {row})', True, 'black')
-            # get screen coords, and blit directly into the screen, to prevent scaling of the text
-            sx, sy = view.world_to_screen((tx, ty))
-            app.screen.blit(index_surf, (sx + 2, sy + 5))
+        hits = view.pick(pygame.mouse.get_pos())
+        if hits:
+            (tx, ty), tile_surf = hits[-1].item
+            col, row = app.get_tile((tx, ty))
+            # drawn in world coordinates, directly at screen resolution
+            view.draw_rect(app.screen, (0, 128, 255), (tx, ty, app.tile_size, app.tile_size))
+            view.draw_rect(app.screen, 'white', (tx, ty, app.tile_size, app.tile_size), 2)
+
+            # text is rendered at screen resolution as well, and cached
+            view.draw_text(app.screen, f'({col}, {row})', (tx + 1, ty + 2), 'black')
 
         # render palyer last.
         view.render(app.screen, [
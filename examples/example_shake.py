@@ -2,7 +2,7 @@ import pygame
 import math
 import random
 
-from pygame_visor import Visor, VisorMode
+from pygame_visor import Visor, VisorMode, OverscanLayer
 from common import App
 
 
@@ -38,6 +38,10 @@ def main():
 
     view.move_to(app.player_pos.center)
 
+    # renders the world with an extra margin of 128 pixels. Shaking (and small movements)
+    # just blit a shifted window of that buffer, instead of re-rendering all tiles.
+    world_layer = OverscanLayer(view, lambda bbox: app.get_tiles_for_bbox(app.tiles, bbox), margin=128)
+
     button = pygame.Surface((100, 50))
     button.fill('black')
 
@@ -70,8 +74,7 @@ def main():
             f = 50 * eased
             view.region.move_ip(x * f, y * f)
 
-        bbox = view.get_bounding_box()
-        view.render(app.screen, app.get_tiles_for_bbox(app.tiles, bbox))
+        world_layer.draw(app.screen)
 
         # render the player
         view.render(app.screen, [
@@ -1,69 +1,55 @@
 import pygame
 
-from pygame_visor import Visor, VisorMode
+from pygame_visor import Visor, VisorMode, Compositor
 from common import App
 
 
 def main():
     app = App(resizable=True, second_player=True)
 
-    surf1 = pygame.Surface((app.screen.width, app.screen.height // 2))
-    surf2 = pygame.Surface((app.screen.width, app.screen.height // 2))
-
     view1 = Visor(
         VisorMode.RegionExpand,
-        surf1.get_rect(),
+        app.screen.get_rect(),
         region=(0, 0, 400, 300),
         limits=app.extended_limits(10),
     )
     view2 = Visor(
         VisorMode.RegionExpand,
-        surf2.get_rect(),
+        app.screen.get_rect(),
         region=(0, 0, 400, 300),
         limits=app.extended_limits(10),
     )
 
+    # both views render directly into subsurfaces of the screen
+    compositor = Compositor(app.screen.get_size())
+    compositor.add_view('player1', view1, (0.0, 0.0, 1.0, 0.5), background='black')
+    compositor.add_view('player2', view2, (0.0, 0.5, 1.0, 0.5), background='black')
+
     view1.move_to(app.player_pos.center)
     view2.move_to(app.player2_pos.center)
 
     font = pygame.font.Font(pygame.font.get_default_font())
-    text1 = font.render(f"Player 1 (WASD)", True, 'black', 'white')
-    text2 = font.render(f"Player 2 (Arrow Keys)", True, 'black', 'white')
+    texts = {
+        'player1': font.render(f"Player 1 (WASD)", True, 'black', 'white'),
+        'player2': font.render(f"Player 2 (Arrow Keys)", True, 'black', 'white'),
+    }
 
     def event_handler(event):
-        # eh
-        nonlocal surf1, surf2
         if event.type == pygame.VIDEORESIZE:
-            surf1 = pygame.Surface((app.screen.width, app.screen.height // 2))
-            surf2 = pygame.Surface((app.screen.width, app.screen.height // 2))
-            view1.update_screen(surf1.get_rect())
-            view2.update_screen(surf2.get_rect())
+            compositor.resize(app.screen.get_size())
 
     for delta in app.loop(60, event_handler):
         view1.lerp_to(app.player_pos.center, 0.1)
         view2.lerp_to(app.player2_pos.center, 0.1)
 
-        surf1.fill('black')
-        bbox = view1.get_bounding_box()
-        view1.render(surf1, app.get_tiles_for_bbox(app.tiles, bbox))
-        view1.render(surf1, [
-            (app.player2_pos.topleft, app.player2_surf),
-            (app.player_pos.topleft, app.player_surf),
-        ])
-
-        surf2.fill('black')
-        bbox = view2.get_bounding_box()
-        view2.render(surf2, app.get_tiles_for_bbox(app.tiles, bbox))
-        view2.render(surf2, [
-            (app.player_pos.topleft, app.player_surf),
-            (app.player2_pos.topleft, app.player2_surf),
-        ])
-
-        app.screen.blit(surf1, (0, 0))
-        app.screen.blit(surf2, (0, app.screen.height // 2))
+        compositor.render(app.screen, lambda bbox: app.get_tiles_for_bbox(app.tiles, bbox))
 
-        app.screen.blit(text1, (10, 10))
-        app.screen.blit(text2, (10, 10 + app.screen.height // 2))
+        for viewport, subsurface in compositor.views(app.screen):
+            viewport.visor.render(subsurface, [
+                (app.player_pos.topleft, app.player_surf),
+                (app.player2_pos.topleft, app.player2_surf),
+            ])
+            subsurface.blit(texts[viewport.name], (10, 10))
 
 
 if __name__ == '__main__':
@@ -1,6 +1,6 @@
 import pygame
 
-from pygame_visor import Visor, VisorMode
+from pygame_visor import Visor, VisorMode, VisorDebugOverlay
 from common import App
 
 
@@ -17,13 +17,18 @@ def main():
     view.move_to(app.player_pos.center)
 
     font = pygame.Font(pygame.font.get_default_font())
+    overlay = VisorDebugOverlay(view)
+    show_overlay = False
 
     def event_handler(event: pygame.Event):
+        nonlocal show_overlay
         if event.type == pygame.KEYDOWN:
             if event.key in (pygame.K_PLUS, pygame.K_KP_PLUS):
                 view.region.scale_by_ip(2, 2)
             elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
                 view.region.scale_by_ip(0.5, 0.5)
+            elif event.key == pygame.K_F3:
+                show_overlay = not show_overlay
 
     for delta in app.loop(60, event_handler):
         view.move_to(app.player_pos.center)
@@ -34,7 +39,10 @@ def main():
         ])
 
         size_text = font.render(str(view.region.size), True, 'white', 'black')
-        app.screen.blit(size_text, (10, 10))
+        app.screen.blit(size_text, size_text.get_rect(bottomleft=(10, app.screen.get_height() - 10)))
+
+        if show_overlay:
+            overlay.draw(app.screen)
 
 
 if __name__ == '__main__':
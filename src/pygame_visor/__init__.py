@@ -1,2 +1,16 @@
 from .visor import *
 from .types import *
+from .backend import *
+from .pick import *
+from .occlusion import *
+from .layer import *
+from .fog import *
+from .parallax import *
+from .lod import *
+from .compositor import *
+from .batch import *
+from .resolution import *
+from .drawlist import *
+from .animation import *
+from .sprite import *
+from .debug import *
@@ -0,0 +1,123 @@
+from collections.abc import Iterable
+from itertools import accumulate
+import bisect
+
+import pygame
+from pygame.typing import RectLike
+
+from .types import IntPair, SurfaceItem, WorldPos
+
+__all__ = ['Animation', 'AnimationFrame']
+
+
+def _copy_area[S: pygame.Surface](source: pygame.Surface, rect: pygame.Rect, cls: type[S]) -> S:
+    # keeps the format, palette and surface alpha, but also the type of the source
+    copy = pygame.Surface.copy(source.subsurface(rect))
+    if type(copy) is not cls:
+        area = copy
+        copy = cls(rect.size, pygame.SRCALPHA if area.get_masks()[3] else 0, area)
+        if area.get_bitsize() == 8:
+            copy.set_palette(area.get_palette())
+        # same size and format, so the pixels can be moved over as they are
+        copy.get_buffer().write(area.get_buffer().raw)
+    # SDL drops the colorkey of per pixel alpha surfaces on copy
+    copy.set_colorkey(source.get_colorkey())
+    copy.set_alpha(source.get_alpha())
+    return copy
+
+
+class AnimationFrame(pygame.Surface):
+    """
+    A single frame of an Animation. When a Visor scales one frame, it scales all frames of the animation
+    in the same pass and keeps them together in the cache, so playing the animation doesn't cause misses.
+    """
+    animation: 'Animation'
+    index: int
+
+    def copy(self) -> pygame.Surface:  # type: ignore[override]
+        """Copies are plain surfaces, they don't belong to the animation."""
+        return _copy_area(self, self.get_rect(), pygame.Surface)
+
+
+class Animation:
+    """
+    Frames cut out of a sprite sheet, with a duration (in ms) per frame.
+
+    Use item() (or frame()) to get the current frame for Visor.render(). Many entities can share one Animation,
+    at different points in time. Like the scaling cache, the frames are copied once, if the sheet changes
+    afterwards, create a new Animation.
+    """
+    sheet: pygame.Surface
+    frames: tuple[AnimationFrame, ...]
+    durations: tuple[float, ...]
+    loop: bool
+
+    def __init__(
+        self,
+        sheet: pygame.Surface,
+        frame_rects: Iterable[RectLike],
+        frame_ms: float | Iterable[float] = 100,
+        *,
+        loop: bool = True,
+    ) -> None:
+        self.sheet = sheet
+        self.frames = tuple(self._cut_frame(index, pygame.Rect(rect)) for index, rect in enumerate(frame_rects))
+        if not self.frames:
+            raise ValueError('An animation needs at least one frame')
+
+        if isinstance(frame_ms, (int, float)):
+            self.durations = (float(frame_ms),) * len(self.frames)
+        else:
+            self.durations = tuple(map(float, frame_ms))
+        if len(self.durations) != len(self.frames) or min(self.durations) <= 0:
+            raise ValueError('frame_ms needs one positive duration per frame')
+        self.loop = loop
+        self._ends = list(accumulate(self.durations))
+
+    @classmethod
+    def from_grid(
+        cls,
+        sheet: pygame.Surface,
+        frame_size: IntPair,
+        *,
+        count: int | None = None,
+        frame_ms: float | Iterable[float] = 100,
+        loop: bool = True,
+    ) -> 'Animation':
+        """Frames of frame_size, read row by row from the sheet (the first count frames only, if given)."""
+        fw, fh = frame_size
+        sw, sh = sheet.get_size()
+        rects = [(x, y, fw, fh) for y in range(0, sh - fh + 1, fh) for x in range(0, sw - fw + 1, fw)]
+        return cls(sheet, rects[:count], frame_ms, loop=loop)
+
+    def _cut_frame(self, index: int, rect: pygame.Rect) -> AnimationFrame:
+        frame = _copy_area(self.sheet, rect, AnimationFrame)
+        frame.animation = self
+        frame.index = index
+        return frame
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    @property
+    def duration(self) -> float:
+        """Duration of a single cycle in ms."""
+        return self._ends[-1]
+
+    def frame_index(self, time_ms: float) -> int:
+        """Index of the frame shown time_ms after the animation started."""
+        if self.loop:
+            time_ms %= self.duration
+        elif time_ms >= self.duration:
+            return len(self.frames) - 1
+        return bisect.bisect_right(self._ends, max(0.0, time_ms))
+
+    def frame(self, time_ms: float) -> AnimationFrame:
+        return self.frames[self.frame_index(time_ms)]
+
+    def item(self, pos: WorldPos, time_ms: float, angle: float | None = None) -> SurfaceItem:
+        """The current frame as item for Visor.render()."""
+        frame = self.frame(time_ms)
+        if angle is None:
+            return pos, frame
+        return pos, frame, angle
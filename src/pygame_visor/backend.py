@@ -0,0 +1,184 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING
+import functools
+import math
+import time
+
+import pygame
+from pygame._sdl2.video import Renderer, Texture
+
+from .animation import AnimationFrame
+from .types import RenderTarget, SurfaceIterable
+
+if TYPE_CHECKING:
+    from .visor import Visor
+
+__all__ = ['RenderBackend', 'SurfaceBackend', 'TextureBackend']
+
+
+class RenderBackend(ABC):
+    """
+    Draws the items passed to Visor.render() onto a render target.
+    """
+
+    @abstractmethod
+    def render(
+        self,
+        visor: 'Visor',
+        target: RenderTarget,
+        surface_iterable: SurfaceIterable,
+        *,
+        world_scale: float = 1.0,
+        budget_ms: float | None = None,
+        premultiplied: bool = False,
+    ) -> int:
+        """See Visor.render()"""
+
+
+class SurfaceBackend(RenderBackend):
+    """
+    The default backend. Scales surfaces on the CPU, using the (shared) scaling cache of the Visor,
+    and blits them onto a pygame.Surface.
+    """
+
+    def render(
+        self,
+        visor: 'Visor',
+        target: RenderTarget,
+        surface_iterable: SurfaceIterable,
+        *,
+        world_scale: float = 1.0,
+        budget_ms: float | None = None,
+        premultiplied: bool = False,
+    ) -> int:
+        start = time.perf_counter()
+        assert isinstance(target, pygame.Surface), 'SurfaceBackend can only render onto surfaces'
+        screen_rect = target.get_rect()
+        assert screen_rect.size == visor.screen, (
+            'Screen rect sizes differ. Make sure to use update_screen(rect) '
+            'before calling this method, if your screen size changed.'
+        )
+        factor = visor.get_scaling_factor() * world_scale
+        draw_area = visor.get_render_area()
+        subsurface = target.subsurface(draw_area) if draw_area != screen_rect else target
+        fmt = visor._surface_format(subsurface)
+        deferred = 0
+        items = blits = 0
+
+        for item in surface_iterable:
+            items += 1
+            world_xy, surf = item[0], item[1]
+            if visor.rotation or len(item) > 2:
+                item_angle = item[2] if len(item) > 2 else 0.0  # type: ignore[misc]
+                angle = visor._quantize_angle(item_angle - visor.rotation)
+                w = math.ceil(surf.get_width() * factor)
+                h = math.ceil(surf.get_height() * factor)
+                rotated = visor._get_rotated_surface(surf, w, h, fmt, angle)
+                cx, cy = visor._item_center(world_xy, surf, world_scale)
+                subsurface.blit(rotated, rotated.get_rect(center=(cx - draw_area.x, cy - draw_area.y)))
+                blits += 1
+                continue
+
+            premultiply = premultiplied and visor._can_premultiply(surf)
+            if not math.isclose(factor, 1.0):
+                if budget_ms is None or isinstance(surf, AnimationFrame):
+                    surf = visor._scale_item_surface(surf, factor, fmt)
+                else:
+                    w = math.ceil(surf.get_width() * factor)
+                    h = math.ceil(surf.get_height() * factor)
+                    scaled = visor._get_budgeted_surface(surf, w, h, fmt, start, budget_ms)
+                    if scaled is not surf and scaled.get_size() == (w, h):
+                        surf = scaled
+                    elif scaled is not surf:
+                        # stale version, only stretched for this frame
+                        surf = pygame.transform.scale(scaled, (w, h))
+                        deferred += 1
+                    else:
+                        deferred += 1
+                        continue
+            else:
+                surf = visor._unscaled_item_surface(surf, fmt)
+            sx, sy = visor.world_to_screen(world_xy)
+            if premultiply:
+                surf = visor._premultiplied_surface(surf)
+                subsurface.blit(surf, (sx - draw_area.x, sy - draw_area.y), special_flags=pygame.BLEND_PREMULTIPLIED)
+            else:
+                subsurface.blit(surf, (sx - draw_area.x, sy - draw_area.y))
+            blits += 1
+
+        visor.stats.items += items
+        visor.stats.blits += blits
+        return deferred
+
+
+class TextureBackend(RenderBackend):
+    """
+    Renders through a pygame._sdl2.video.Renderer. Surfaces are uploaded as textures once (kept in an LRU cache
+    of cache_size entries) and scaled by the renderer while drawing, so nothing is cached per zoom level.
+
+    The render target is a Texture created with target=True, or None to draw to the window of the renderer.
+    Like the scaling cache, textures are cached per surface object, call clear_cache() if a surface changed.
+
+    budget_ms and premultiplied are accepted, but ignored: there are no scaling cache misses to defer,
+    and textures are drawn with the blend mode of their surface.
+    """
+    renderer: Renderer
+
+    def __init__(self, renderer: Renderer, cache_size: int = 256) -> None:
+        self.renderer = renderer
+        self._get_texture = functools.lru_cache(maxsize=cache_size)(self._create_texture)
+
+    def _create_texture(self, surface: pygame.Surface) -> Texture:
+        return Texture.from_surface(self.renderer, surface)
+
+    def clear_cache(self) -> None:
+        self._get_texture.cache_clear()
+
+    def render(
+        self,
+        visor: 'Visor',
+        target: RenderTarget,
+        surface_iterable: SurfaceIterable,
+        *,
+        world_scale: float = 1.0,
+        budget_ms: float | None = None,
+        premultiplied: bool = False,
+    ) -> int:
+        assert target is None or isinstance(target, Texture), 'TextureBackend can only render onto textures'
+        renderer = self.renderer
+        previous_target = renderer.target
+        renderer.target = target
+        try:
+            renderer.set_viewport(None)
+            assert renderer.get_viewport().size == visor.screen, (
+                'Screen rect sizes differ. Make sure to use update_screen(rect) '
+                'before calling this method, if your screen size changed.'
+            )
+            factor = visor.get_scaling_factor() * world_scale
+            draw_area = visor.get_render_area()
+            # coordinates are relative to, and clipped by the viewport
+            renderer.set_viewport(draw_area)
+
+            count = 0
+            for item in surface_iterable:
+                count += 1
+                world_xy, surf = item[0], item[1]
+                w = math.ceil(surf.get_width() * factor)
+                h = math.ceil(surf.get_height() * factor)
+                texture = self._get_texture(surf)
+                if visor.rotation or len(item) > 2:
+                    angle = (item[2] if len(item) > 2 else 0.0) - visor.rotation  # type: ignore[misc]
+                    cx, cy = visor._item_center(world_xy, surf, world_scale)
+                    rect = pygame.FRect(0, 0, w, h)
+                    rect.center = cx - draw_area.x, cy - draw_area.y
+                    # the renderer rotates clockwise
+                    texture.draw(dstrect=rect, angle=-angle)
+                    continue
+                sx, sy = visor.world_to_screen(world_xy)
+                texture.draw(dstrect=(sx - draw_area.x, sy - draw_area.y, w, h))
+            visor.stats.items += count
+            visor.stats.blits += count
+        finally:
+            renderer.set_viewport(None)
+            renderer.target = previous_target
+        return 0
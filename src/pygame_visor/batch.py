@@ -0,0 +1,198 @@
+from collections import deque
+from collections.abc import Callable, Generator, Iterable
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+from typing import Final, Literal, NamedTuple
+import multiprocessing
+import os
+import weakref
+
+import pygame
+from pygame import FRect
+from pygame.typing import ColorLike
+
+from .types import ScreenSize, SurfaceProvider, Limits
+from .visor import Visor, VisorMode
+
+__all__ = ['VisorState', 'render_batch']
+
+# Called once per worker process, returns the surface provider used for all renders in that worker.
+# Must be picklable, e.g. a module level function or a functools.partial of one.
+type SceneFactory = Callable[[], SurfaceProvider]
+
+# pixel layout of the shared buffers, 4 bytes per pixel
+_BUFFER_FORMAT: Final[Literal['RGBX']] = 'RGBX'
+
+_worker_provider: SurfaceProvider | None = None
+
+
+class VisorState(NamedTuple):
+    """Picklable description of a Visor, see render_batch()."""
+    mode: VisorMode
+    screen: ScreenSize
+    region: tuple[float, float, float, float]
+    limits: Limits | None = None
+    rotation: float = 0.0
+    chunk_size: int | None = None
+    origin: tuple[int, int] = (0, 0)
+
+    @classmethod
+    def from_visor(cls, visor: Visor) -> 'VisorState':
+        x, y, w, h = visor.region
+        return cls(visor.mode, visor.screen, (x, y, w, h), visor.limits, visor.rotation, visor.chunk_size, visor.origin)
+
+    def to_visor(self) -> Visor:
+        visor = Visor(
+            self.mode, self.screen,
+            region=FRect(self.region), limits=self.limits, rotation=self.rotation, chunk_size=self.chunk_size,
+        )
+        visor.origin = self.origin
+        # applies the limits, the same way an interactive visor would
+        visor.move_to(visor.region.center)
+        return visor
+
+
+class _SegmentPool:
+    """
+    Shared memory segments for render_batch(). A segment is reused once the surface built on it is gone.
+    """
+
+    def __init__(self) -> None:
+        self._free: list[SharedMemory] = []
+        self._closed = False
+
+    def acquire(self, size: int) -> SharedMemory:
+        for index, shm in enumerate(self._free):
+            if shm.size >= size:
+                return self._free.pop(index)
+        return SharedMemory(create=True, size=max(1, size))
+
+    def release(self, shm: SharedMemory) -> None:
+        if self._closed:
+            shm.close()
+            shm.unlink()
+        else:
+            self._free.append(shm)
+
+    def close(self) -> None:
+        """Destroy the free segments. Segments still in use are destroyed once they are released."""
+        self._closed = True
+        for shm in self._free:
+            shm.close()
+            shm.unlink()
+        self._free.clear()
+
+
+class _SharedBuffer:
+    """
+    Exports the first nbytes of a segment to pygame.image.frombuffer(). The surface keeps this object alive,
+    the segment goes back to the pool after both are garbage collected.
+    """
+
+    def __init__(self, pool: _SegmentPool, shm: SharedMemory, nbytes: int) -> None:
+        self._shm = shm
+        self._nbytes = nbytes
+        weakref.finalize(self, pool.release, shm)
+
+    def __buffer__(self, flags: int) -> memoryview:
+        return self._shm.buf[:self._nbytes]
+
+    def __release_buffer__(self, view: memoryview) -> None:
+        view.release()
+
+
+def _init_worker(scene: SceneFactory) -> None:
+    global _worker_provider
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    pygame.display.init()
+    # some scenes might want to convert()/convert_alpha() their surfaces
+    pygame.display.set_mode((1, 1))
+    _worker_provider = scene()
+
+
+def _render_state(state: VisorState, shm_name: str, background: ColorLike) -> None:
+    assert _worker_provider is not None, 'Worker was not initialized'
+    width, height = state.screen
+    shm = SharedMemory(name=shm_name)
+    view = shm.buf[:width * height * 4]
+    try:
+        # render straight into the shared buffer
+        surface = pygame.image.frombuffer(view, state.screen, _BUFFER_FORMAT)
+        surface.fill(background)
+        visor = state.to_visor()
+        visor.render(surface, _worker_provider(visor.get_bounding_box()))
+        del surface
+    finally:
+        view.release()
+        shm.close()
+
+
+def _collect(state: VisorState, shm: SharedMemory, future: Future[None], pool: _SegmentPool) -> pygame.Surface:
+    try:
+        future.result()
+    except BaseException:
+        pool.release(shm)
+        raise
+    width, height = state.screen
+    # no copy, the surface uses the shared memory until it's garbage collected
+    return pygame.image.frombuffer(_SharedBuffer(pool, shm, width * height * 4), state.screen, _BUFFER_FORMAT)
+
+
+def render_batch(
+    scene: SceneFactory,
+    states: Iterable[VisorState],
+    *,
+    max_workers: int | None = None,
+    background: ColorLike = (0, 0, 0),
+    mp_context: BaseContext | None = None,
+) -> Generator[pygame.Surface]:
+    """
+    Render many visor states (thumbnails, replay frames, previews, ...) on all cores.
+
+    Every worker process runs SDL's dummy video driver and calls scene() once to get its surface provider.
+    Each state is rendered directly into a shared memory buffer, and the yielded Surface uses that buffer without
+    copying it. Buffers are reused for later states once their surface got garbage collected.
+    Surfaces are yielded in the same order as the states. Only a few renders per worker are in flight at once,
+    so arbitrary long iterables of states can be streamed.
+
+    The "spawn" start method is used by default, so scene needs to be importable (e.g. not a lambda).
+    """
+    if mp_context is None:
+        mp_context = multiprocessing.get_context('spawn')
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_in_flight = max_workers * 2
+
+    executor = ProcessPoolExecutor(
+        max_workers,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(scene,),
+    )
+
+    pool = _SegmentPool()
+    pending: deque[tuple[VisorState, SharedMemory, Future[None]]] = deque()
+    try:
+        for state in states:
+            width, height = state.screen
+            shm = pool.acquire(width * height * 4)
+            try:
+                future = executor.submit(_render_state, state, shm.name, background)
+            except BaseException:
+                pool.release(shm)
+                raise
+            pending.append((state, shm, future))
+            if len(pending) >= max_in_flight:
+                yield _collect(*pending.popleft(), pool)
+
+        while pending:
+            yield _collect(*pending.popleft(), pool)
+    finally:
+        for _, shm, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True, cancel_futures=True)
+        for _, shm, _ in pending:
+            pool.release(shm)
+        pool.close()
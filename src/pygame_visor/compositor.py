@@ -0,0 +1,163 @@
+from collections.abc import Generator, Iterator
+import math
+
+import pygame
+from pygame import FRect
+from pygame.typing import ColorLike
+
+from .types import FloatQuad, ScreenSize, SurfaceItem, SurfaceProvider
+from .visor import Visor
+
+__all__ = ['Viewport', 'Compositor']
+
+
+class Viewport:
+    """
+    A named area of the screen, bound to a Visor.
+    The layout is relative to the screen size: (x, y, width, height) with values from 0.0 to 1.0.
+    If background is set, the view is filled with it before every Compositor.render().
+    """
+    name: str
+    visor: Visor
+    layout: FloatQuad
+    rect: pygame.Rect
+    background: ColorLike | None
+
+    def __init__(self, name: str, visor: Visor, layout: FloatQuad, background: ColorLike | None = None) -> None:
+        self.name = name
+        self.visor = visor
+        self.layout = layout
+        self.background = background
+        self.rect = pygame.Rect(0, 0, 0, 0)
+
+    def update_rect(self, screen: ScreenSize) -> None:
+        sw, sh = screen
+        x, y, w, h = self.layout
+        left, top = round(x * sw), round(y * sh)
+        self.rect = pygame.Rect(left, top, round((x + w) * sw) - left, round((y + h) * sh) - top)
+        self.visor.update_screen(self.rect.size)
+
+
+class Compositor:
+    """
+    Renders multiple views (split screen, minimaps, ...) directly into subsurfaces of the screen,
+    without any intermediate buffers.
+
+    Views sharing the same scaling factor and overlapping bounding boxes only query the surface provider once.
+    The scaled surfaces are shared between all views through the scaling cache of the Visor.
+    """
+    screen: ScreenSize
+
+    def __init__(self, screen: ScreenSize) -> None:
+        self.screen = screen
+        self._viewports: dict[str, Viewport] = {}
+
+    def add_view(
+        self,
+        name: str,
+        visor: Visor,
+        layout: FloatQuad = (0.0, 0.0, 1.0, 1.0),
+        *,
+        background: ColorLike | None = None,
+    ) -> Viewport:
+        if name in self._viewports:
+            raise ValueError(f'A view named {name!r} already exists')
+        viewport = Viewport(name, visor, layout, background)
+        viewport.update_rect(self.screen)
+        self._viewports[name] = viewport
+        return viewport
+
+    def remove_view(self, name: str) -> None:
+        del self._viewports[name]
+
+    def __getitem__(self, name: str) -> Viewport:
+        return self._viewports[name]
+
+    def __iter__(self) -> Iterator[Viewport]:
+        return iter(self._viewports.values())
+
+    def resize(self, screen: ScreenSize) -> None:
+        """Call this whenever the screen got resized. Updates all views at once."""
+        self.screen = screen
+        for viewport in self._viewports.values():
+            viewport.update_rect(screen)
+
+    def views(self, surface: pygame.Surface) -> Generator[tuple[Viewport, pygame.Surface]]:
+        """
+        Yields every viewport with its subsurface of surface, e.g. to render additional items per view.
+        """
+        self._check_surface(surface)
+        for viewport in self._viewports.values():
+            yield viewport, surface.subsurface(viewport.rect)
+
+    def render(self, surface: pygame.Surface, provider: SurfaceProvider) -> None:
+        """
+        Render the items returned by provider into every view.
+        """
+        self._check_surface(surface)
+        for viewport in self._viewports.values():
+            if viewport.background is not None:
+                surface.fill(viewport.background, viewport.rect)
+        for group in self._group_views():
+            if len(group) == 1:
+                viewport = group[0]
+                visor = viewport.visor
+                visor.render(surface.subsurface(viewport.rect), provider(visor.get_bounding_box()))
+                continue
+
+            bboxes = [viewport.visor.get_bounding_box() for viewport in group]
+            items = list(provider(bboxes[0].unionall(bboxes[1:])))
+            for viewport, bbox in zip(group, bboxes):
+                visor = viewport.visor
+                visor.render(surface.subsurface(viewport.rect), self._filter_items(items, bbox, visor))
+
+    @staticmethod
+    def _filter_items(items: list[SurfaceItem], bbox: FRect, visor: Visor) -> Generator[SurfaceItem]:
+        culled = 0
+        to_local = visor.to_local
+        for item in items:
+            (x, y), surf = to_local(item[0]), item[1]
+            rect = FRect(x, y, surf.get_width(), surf.get_height())
+            if len(item) > 2:
+                # rotated around the center, might reach out up to half the diagonal
+                diagonal = math.hypot(rect.width, rect.height)
+                rect.inflate_ip(diagonal - rect.width, diagonal - rect.height)
+            if bbox.colliderect(rect):
+                yield item
+            else:
+                culled += 1
+        visor.stats.culled += culled
+
+    def _group_views(self) -> list[list[Viewport]]:
+        """
+        Group views with the same scaling factor, if querying their union is cheaper than querying them one by one.
+        Only views with the same origin share a query, their bounding boxes are relative to it.
+        """
+        by_factor: dict[tuple[float, tuple[int, int], int | None], list[Viewport]] = {}
+        for viewport in self._viewports.values():
+            visor = viewport.visor
+            key = visor.get_scaling_factor(), visor.origin, visor.chunk_size
+            by_factor.setdefault(key, []).append(viewport)
+
+        groups: list[list[Viewport]] = []
+        for candidates in by_factor.values():
+            factor_groups: list[list[Viewport]] = []
+            for viewport in candidates:
+                bbox = viewport.visor.get_bounding_box()
+                for group in factor_groups:
+                    bboxes = [other.visor.get_bounding_box() for other in group]
+                    union = bbox.unionall(bboxes)
+                    area = sum(b.width * b.height for b in bboxes) + bbox.width * bbox.height
+                    if union.width * union.height <= area:
+                        group.append(viewport)
+                        break
+                else:
+                    factor_groups.append([viewport])
+            groups.extend(factor_groups)
+        return groups
+
+    def _check_surface(self, surface: pygame.Surface) -> None:
+        assert surface.get_size() == tuple(self.screen), (
+            'Screen sizes differ. Make sure to use resize(size) '
+            'before rendering, if your screen size changed.'
+        )
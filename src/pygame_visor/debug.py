@@ -0,0 +1,149 @@
+from collections.abc import Callable
+import time
+
+import pygame
+from pygame.typing import ColorLike
+
+from .types import ScreenPos
+from .visor import Visor
+
+__all__ = ['VisorDebugOverlay']
+
+
+class VisorDebugOverlay:
+    """
+    Draws debug information of a Visor on top of a rendered frame: the world bounding box, the active
+    screen area, the limits and the world position of the mouse, plus a panel with a frame time graph and the
+    render counters of visor.stats (which are reset by every draw()).
+
+    The overlay tries to stay out of the numbers it shows: the panel background is rendered once, the graph
+    scrolls by one column per frame instead of being redrawn, and the text is only updated every
+    update_interval seconds.
+    """
+    visor: Visor
+    frame_ms: float  # time between the last two draw() calls
+    overlay_ms: float  # time the last draw() took itself
+
+    def __init__(
+        self,
+        visor: Visor,
+        *,
+        history: int = 120,
+        graph_height: int = 40,
+        graph_ms: float = 1000 / 30,
+        update_interval: float = 0.25,
+        font: str | None = None,
+        font_size: int = 16,
+        color: ColorLike = 'yellow',
+        timer: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self.visor = visor
+        self.graph_ms = graph_ms
+        self.update_interval = update_interval
+        self.color = pygame.Color(color)
+        self.timer = timer
+        self.frame_ms = 0.0
+        self.overlay_ms = 0.0
+
+        if not pygame.font.get_init():
+            pygame.font.init()
+        self._font = pygame.font.Font(font, font_size)
+        self._line_height = self._font.get_linesize()
+        self._lines = 4
+        self._padding = 4
+
+        text_height = self._line_height * self._lines
+        self._graph = pygame.Surface((history, graph_height))
+        self._graph_rect = self._graph.get_rect(topleft=(self._padding, self._padding * 2 + text_height))
+        self._panel_size = (
+            max(history, self._font.size('items 000000 blits 000000 culled 000000')[0]) + self._padding * 2,
+            self._graph_rect.bottom + self._padding,
+        )
+        self._background = self._create_background()
+        self._text: pygame.Surface | None = None
+        self._last_frame: float | None = None
+        self._last_update: float | None = None
+        self._last_cache_info = Visor.get_scaling_cache_info()
+        self._frame_sum = 0.0
+        self._frame_count = 0
+
+    def _create_background(self) -> pygame.Surface:
+        background = pygame.Surface(self._panel_size, pygame.SRCALPHA)
+        background.fill((0, 0, 0, 160))
+        return background
+
+    def _add_sample(self, frame_ms: float) -> None:
+        """Scroll the graph one column to the left and draw the new sample into the freed column."""
+        graph = self._graph
+        width, height = graph.get_size()
+        graph.scroll(-1, 0)
+        graph.fill('black', (width - 1, 0, 1, height))
+        bar = min(height, round(frame_ms / self.graph_ms * height))
+        color = self.color if frame_ms <= self.graph_ms else pygame.Color('red')
+        graph.fill(color, (width - 1, height - bar, 1, bar))
+        # target frame time
+        graph.set_at((width - 1, height // 2), 'gray50')
+
+    def _render_text(self, mouse_pos: ScreenPos | None) -> pygame.Surface:
+        stats = self.visor.stats
+        info = Visor.get_scaling_cache_info()
+        hits = info.hits - self._last_cache_info.hits
+        misses = info.misses - self._last_cache_info.misses
+        self._last_cache_info = info
+        hit_rate = f'{hits / (hits + misses):.0%}' if hits + misses else '-'
+
+        average = self._frame_sum / self._frame_count if self._frame_count else 0.0
+        self._frame_sum = 0.0
+        self._frame_count = 0
+        fps = f'{1000 / average:.0f}' if average else '-'
+
+        world_pos = self.visor.screen_to_world(mouse_pos) if mouse_pos is not None else None
+        mouse = f'{world_pos[0]:.1f}, {world_pos[1]:.1f}' if world_pos is not None else '-'
+
+        lines = [
+            f'frame {average:.1f} ms ({fps} fps), overlay {self.overlay_ms:.2f} ms',
+            f'items {stats.items} blits {stats.blits} culled {stats.culled}',
+            f'cache {hit_rate} hits, {Visor.get_scaling_cache_bytes() / 2 ** 20:.1f} MiB',
+            f'mouse {mouse}',
+        ]
+        text = pygame.Surface((self._panel_size[0], self._line_height * self._lines), pygame.SRCALPHA)
+        for i, line in enumerate(lines):
+            text.blit(self._font.render(line, True, self.color), (self._padding, i * self._line_height))
+        return text
+
+    def draw(self, surface: pygame.Surface, mouse_pos: ScreenPos | None = None) -> None:
+        """
+        Draw the overlay, call it once per frame after rendering everything else. mouse_pos defaults to
+        pygame.mouse.get_pos(), if a display is initialized.
+        """
+        start = self.timer()
+        if self._last_frame is not None:
+            self.frame_ms = (start - self._last_frame) * 1000
+            self._frame_sum += self.frame_ms
+            self._frame_count += 1
+            self._add_sample(self.frame_ms)
+        self._last_frame = start
+
+        if mouse_pos is None and pygame.display.get_init():
+            mouse_pos = pygame.mouse.get_pos()
+
+        visor = self.visor
+        if visor.limits is not None:
+            left, top, right, bottom = visor.limits
+            visor.draw_rect(surface, 'red', (left, top, right - left, bottom - top), 1)
+        visor.draw_rect(surface, 'cyan', visor.get_bounding_box(), 1)
+        pygame.draw.rect(surface, 'magenta', visor.get_active_screen_area(), 1)
+        if mouse_pos is not None and visor.screen_to_world(mouse_pos) is not None:
+            pygame.draw.circle(surface, self.color, mouse_pos, 3, 1)
+
+        if self._text is None or self._last_update is None or start - self._last_update >= self.update_interval:
+            self._text = self._render_text(mouse_pos)
+            self._last_update = start
+
+        panel_pos = visor.get_active_screen_area().topleft
+        surface.blit(self._background, panel_pos)
+        surface.blit(self._text, (panel_pos[0], panel_pos[1] + self._padding))
+        surface.blit(self._graph, self._graph_rect.move(panel_pos))
+
+        visor.stats.reset()
+        self.overlay_ms = (self.timer() - start) * 1000
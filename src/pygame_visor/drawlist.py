@@ -0,0 +1,136 @@
+from collections.abc import Iterator
+import bisect
+
+import pygame
+
+from .types import WorldPos, ChunkPos, SurfaceItem, is_chunk_pos
+
+__all__ = ['DrawItem', 'DrawList']
+
+
+class DrawItem:
+    """
+    An entry of a DrawList. Update pos, surface, angle and sort_key in place, whenever your entity changes.
+    Without a sort_key, items are y-sorted by their bottom edge (pos y + surface height), (chunk, local)
+    positions need the chunk_size of the DrawList for that.
+    """
+    __slots__ = ('pos', 'surface', 'angle', 'sort_key', '_layer', '_draw_list')
+
+    pos: WorldPos | ChunkPos
+    surface: pygame.Surface
+    angle: float | None
+    sort_key: float | None
+
+    def __init__(
+        self,
+        draw_list: 'DrawList',
+        pos: WorldPos | ChunkPos,
+        surface: pygame.Surface,
+        layer: int,
+        sort_key: float | None,
+        angle: float | None,
+    ) -> None:
+        self.pos = pos
+        self.surface = surface
+        self.angle = angle
+        self.sort_key = sort_key
+        self._layer = layer
+        self._draw_list = draw_list
+
+    @property
+    def layer(self) -> int:
+        return self._layer
+
+    @layer.setter
+    def layer(self, layer: int) -> None:
+        if layer != self._layer:
+            self._draw_list._move(self, layer)
+
+    def depth(self) -> float:
+        if self.sort_key is not None:
+            return self.sort_key
+        pos = self.pos
+        if is_chunk_pos(pos):
+            chunk_size = self._draw_list.chunk_size
+            if chunk_size is None:
+                raise ValueError('Chunk positions are only supported with a chunk_size')
+            (_, cy), (_, y) = pos
+            return cy * chunk_size + y + self.surface.get_height()
+        return pos[1] + self.surface.get_height()
+
+    def as_tuple(self) -> SurfaceItem:
+        # Visor.render() localizes (chunk, local) positions
+        if self.angle is None:
+            return self.pos, self.surface  # type: ignore[return-value]
+        return self.pos, self.surface, self.angle  # type: ignore[return-value]
+
+
+class DrawList:
+    """
+    Persistent, depth sorted list of items to render, grouped by integer layers (lower layers are drawn first).
+
+    Items are kept in their order from the previous frame, and each layer is re-sorted when iterated. Entities
+    usually only move a little between frames, so the lists are nearly sorted already, which Python's sort
+    handles in close to linear time. Equal depths keep their insertion order.
+
+    A DrawList is a SurfaceIterable, so it can be passed directly to Visor.render(). For (chunk, local) positions
+    pass the chunk_size of the Visor, items are then sorted by their absolute y. Plain positions are relative to
+    the (moving) origin and can't be mixed with them.
+    """
+
+    chunk_size: int | None
+
+    def __init__(self, chunk_size: int | None = None) -> None:
+        self.chunk_size = chunk_size
+        self._layers: dict[int, list[DrawItem]] = {}
+        self._layer_order: list[int] = []
+
+    def add(
+        self,
+        pos: WorldPos | ChunkPos,
+        surface: pygame.Surface,
+        *,
+        layer: int = 0,
+        sort_key: float | None = None,
+        angle: float | None = None,
+    ) -> DrawItem:
+        item = DrawItem(self, pos, surface, layer, sort_key, angle)
+        self._bucket(layer).append(item)
+        return item
+
+    def remove(self, item: DrawItem) -> None:
+        self._layers[item.layer].remove(item)
+
+    def clear(self) -> None:
+        self._layers.clear()
+        self._layer_order.clear()
+
+    def __len__(self) -> int:
+        return sum(len(bucket) for bucket in self._layers.values())
+
+    def _bucket(self, layer: int) -> list[DrawItem]:
+        bucket = self._layers.get(layer)
+        if bucket is None:
+            bucket = self._layers[layer] = []
+            bisect.insort(self._layer_order, layer)
+        return bucket
+
+    def _move(self, item: DrawItem, layer: int) -> None:
+        self._layers[item.layer].remove(item)
+        item._layer = layer
+        self._bucket(layer).append(item)
+
+    def sort(self) -> None:
+        """Restore the depth order of every layer. Called by iterating the DrawList."""
+        for bucket in self._layers.values():
+            bucket.sort(key=DrawItem.depth)
+
+    def items(self) -> Iterator[DrawItem]:
+        """All DrawItems in draw order."""
+        self.sort()
+        for layer in self._layer_order:
+            yield from self._layers[layer]
+
+    def __iter__(self) -> Iterator[SurfaceItem]:
+        for item in self.items():
+            yield item.as_tuple()
@@ -0,0 +1,225 @@
+from collections import OrderedDict
+from collections.abc import Buffer
+import math
+
+import pygame
+from pygame.typing import ColorLike
+
+from .types import IntPair, WorldPos
+from .visor import Visor
+
+__all__ = ['FogOfWar']
+
+
+class FogOfWar:
+    """
+    A visibility grid drawn as fog over the world.
+
+    Every cell stores one byte, from HIDDEN (0) to VISIBLE (255), values in between (like EXPLORED) are drawn
+    as thinner fog. For drawing, only the cells inside the visors bounding box are turned into a tiny mask
+    surface (one pixel per cell), which is scaled (and cached per zoom and rotation) and drawn with a single alpha
+    blit. The mask is only rebuilt when cells change, and just patched if only a few cells in view changed.
+
+    data is a plain bytearray (row by row), update_from() accepts any buffer of the same size,
+    e.g. a uint8 NumPy array, if you compute visibility with NumPy.
+
+    origin and the positions passed to cell_at() and reveal() are absolute world positions, with a floating
+    origin Visor that's a local position plus visor.get_origin_offset().
+    """
+    HIDDEN = 0
+    EXPLORED = 128
+    VISIBLE = 255
+
+    columns: int
+    rows: int
+    cell_size: float
+    origin: tuple[float, float]
+    data: bytearray
+
+    # up to this many changed cells in view are patched into the mask, more rebuild it
+    patch_limit: int = 64
+    # scaled versions of the current mask kept, e.g. for several visors with different zoom levels
+    scale_cache_size: int = 4
+
+    def __init__(
+        self,
+        size: IntPair,
+        cell_size: float,
+        *,
+        origin: WorldPos = (0.0, 0.0),
+        color: ColorLike = 'black',
+        opacity: float = 1.0,
+        value: int = HIDDEN,
+    ) -> None:
+        self.columns, self.rows = size
+        if self.columns <= 0 or self.rows <= 0 or cell_size <= 0:
+            raise ValueError('The grid size and cell_size must be positive')
+        self.cell_size = cell_size
+        self.origin = origin[0], origin[1]
+        self.data = bytearray([value]) * (self.columns * self.rows)
+
+        r, g, b, _ = pygame.Color(color)
+        self._rgb0 = bytes((r, g, b, 0))
+        # cell value -> fog alpha
+        self._alpha = bytes(round((255 - v) * opacity) for v in range(256))
+
+        self._window: pygame.Rect | None = None
+        self._mask: pygame.Surface | None = None
+        self._fmt: pygame.Surface | None = None
+        self._dirty: set[int] | None = None  # changed cell indices, None if everything needs a rebuild
+        self._scaled: OrderedDict[tuple[int, int, float], pygame.Surface] = OrderedDict()
+
+    def __getitem__(self, cell: IntPair) -> int:
+        return self.data[self._index(cell)]
+
+    def __setitem__(self, cell: IntPair, value: int) -> None:
+        index = self._index(cell)
+        if self.data[index] != value:
+            self.data[index] = value
+            if self._dirty is not None:
+                self._dirty.add(index)
+
+    def _index(self, cell: IntPair) -> int:
+        column, row = cell
+        if not (0 <= column < self.columns and 0 <= row < self.rows):
+            raise IndexError(f'Cell out of range: {cell}')
+        return row * self.columns + column
+
+    def cell_at(self, pos: WorldPos) -> IntPair:
+        """The (column, row) covering a world position. May lie outside of the grid."""
+        ox, oy = self.origin
+        return int((pos[0] - ox) // self.cell_size), int((pos[1] - oy) // self.cell_size)
+
+    def fill(self, value: int) -> None:
+        self.data[:] = bytes([value]) * len(self.data)
+        self._dirty = None
+
+    def update_from(self, buffer: Buffer) -> None:
+        """Replace all cells with a buffer of columns * rows bytes, row by row."""
+        data = memoryview(buffer).cast('B')
+        if len(data) != len(self.data):
+            raise ValueError(f'Expected {len(self.data)} bytes, got {len(data)}')
+        self.data[:] = data
+        self._dirty = None
+
+    def reveal(self, pos: WorldPos, radius: float, value: int = VISIBLE) -> None:
+        """Set all cells with their center within radius (world units) of pos, if that makes them more visible."""
+        ox, oy = self.origin
+        size = self.cell_size
+        x, y = pos
+        c0, r0 = self.cell_at((x - radius, y - radius))
+        c1, r1 = self.cell_at((x + radius, y + radius))
+        for row in range(max(0, r0), min(self.rows, r1 + 1)):
+            dy = oy + (row + 0.5) * size - y
+            for column in range(max(0, c0), min(self.columns, c1 + 1)):
+                dx = ox + (column + 0.5) * size - x
+                if dx * dx + dy * dy <= radius * radius and self.data[row * self.columns + column] < value:
+                    self[column, row] = value
+
+    def _visible_window(self, visor: Visor) -> pygame.Rect:
+        """Cells (as column, row, width, height) intersecting the visors bounding box."""
+        bbox = visor.get_bounding_box().move(visor.get_origin_offset())
+        c0, r0 = self.cell_at(bbox.topleft)
+        c1, r1 = self.cell_at(bbox.bottomright)
+        return pygame.Rect(c0, r0, c1 - c0 + 1, r1 - r0 + 1).clip(0, 0, self.columns, self.rows)
+
+    def _build_mask(self, window: pygame.Rect, fmt: pygame.Surface | None) -> pygame.Surface:
+        c0, r0, w, h = window
+        columns = self.columns
+        alpha = bytearray()
+        for row in range(r0, r0 + h):
+            start = row * columns + c0
+            alpha += self.data[start:start + w]
+        rgba = bytearray(self._rgb0 * (w * h))
+        rgba[3::4] = alpha.translate(self._alpha)
+        mask = pygame.image.frombytes(bytes(rgba), (w, h), 'RGBA')
+        if fmt is not None:
+            # in the pixel format of the target, so the scaled mask doesn't need a conversion
+            mask = mask.convert(fmt)
+        return mask
+
+    def _patch_mask(self, mask: pygame.Surface, window: pygame.Rect, cells: set[int]) -> pygame.Surface:
+        # a new surface, so masks returned by get_mask() earlier stay unchanged
+        mask = mask.copy()
+        r, g, b, _ = self._rgb0
+        for index in cells:
+            row, column = divmod(index, self.columns)
+            if window.collidepoint(column, row):
+                mask.set_at((column - window.x, row - window.y), (r, g, b, self._alpha[self.data[index]]))
+        return mask
+
+    def get_mask(
+        self,
+        visor: Visor,
+        target: pygame.Surface | None = None,
+    ) -> tuple[pygame.Rect, pygame.Surface | None]:
+        """
+        The cell window in view and its mask surface (None if no cell is in view), updated if required.
+        The mask uses the pixel format of target, if given.
+        """
+        window = self._visible_window(visor)
+        if not window:
+            return window, None
+
+        fmt = None
+        if target is not None:
+            fmt = Visor._format_prototype(Visor._surface_format(target), True)
+        mask = self._mask
+        dirty = self._dirty
+        if self._mask is None or dirty is None or window != self._window or fmt is not self._fmt:
+            self._mask = self._build_mask(window, fmt)
+        elif dirty:
+            in_view = {i for i in dirty if window.collidepoint(i % self.columns, i // self.columns)}
+            if len(in_view) > self.patch_limit:
+                self._mask = self._build_mask(window, fmt)
+            elif in_view:
+                self._mask = self._patch_mask(self._mask, window, in_view)
+        if self._mask is not mask:
+            self._scaled.clear()
+        self._window = window
+        self._fmt = fmt
+        self._dirty = set()
+        return window, self._mask
+
+    def _scale_mask(self, mask: pygame.Surface, width: int, height: int, angle: float) -> pygame.Surface:
+        key = width, height, angle
+        scaled = self._scaled.get(key)
+        if scaled is not None:
+            self._scaled.move_to_end(key)
+            return scaled
+        scaled = pygame.transform.scale(mask, (width, height))
+        if angle:
+            scaled = pygame.transform.rotate(scaled, angle)
+        self._scaled[key] = scaled
+        if len(self._scaled) > self.scale_cache_size:
+            self._scaled.popitem(last=False)
+        return scaled
+
+    def draw(self, surface: pygame.Surface, visor: Visor) -> None:
+        """
+        Draw the fog over everything rendered by visor so far. Not drawn through render(), so the mask
+        doesn't show up in picking, stats or occlusion culling, nor in the scaling cache of the visors.
+        """
+        window, mask = self.get_mask(visor, surface)
+        if mask is None:
+            return
+        ox, oy = self.origin
+        offset_x, offset_y = visor.get_origin_offset()
+        size = self.cell_size
+        x, y = ox - offset_x + window.x * size, oy - offset_y + window.y * size
+        factor = visor.get_scaling_factor() * size
+        w = math.ceil(window.width * factor)
+        h = math.ceil(window.height * factor)
+        if visor.rotation:
+            step = visor.rotation_step
+            scaled = self._scale_mask(mask, w, h, round(-visor.rotation / step) * step % 360)
+            center = x + window.width * size / 2, y + window.height * size / 2
+            rect = scaled.get_rect(center=visor.world_to_screen(center))
+        else:
+            scaled = self._scale_mask(mask, w, h, 0.0)
+            rect = scaled.get_rect(topleft=visor.world_to_screen((x, y)))
+
+        old_clip = surface.get_clip()
+        surface.set_clip(old_clip.clip(visor.get_render_area()))
+        surface.blit(scaled, rect)
+        surface.set_clip(old_clip)
@@ -0,0 +1,203 @@
+from collections.abc import Collection
+import math
+
+import pygame
+from pygame.typing import ColorLike, Point
+
+from .types import SurfaceItem, SurfaceProvider
+from .visor import Visor, VisorMode
+
+__all__ = ['Layer', 'OverscanLayer']
+
+type LayerItems = Collection[SurfaceItem] | SurfaceProvider
+type _TransformKey = int | tuple[float, float, tuple[int, int], VisorMode, float, tuple[int, int]]
+
+
+class Layer:
+    """
+    A retained offscreen surface rendered through a Visor.
+
+    The layer is only re-rendered when the transform of its visor or its content version changes,
+    otherwise draw() just blits the cached surface. Use it for things that rarely change, like
+    static backgrounds, minimaps or HUD maps.
+
+    Items are either a collection of ((world_x, world_y), surface) tuples, or a callable receiving the
+    bounding box and returning such an iterable (e.g. your tile lookup). Call invalidate() or
+    set_items() whenever the content changes.
+
+    Dynamic layers re-render on every draw(). Use this for content you know changes every frame,
+    but which should still be composited like any other layer.
+    """
+    visor: Visor
+    dynamic: bool
+    version: int
+    surface: pygame.Surface
+
+    def __init__(
+        self,
+        visor: Visor,
+        items: LayerItems = (),
+        *,
+        dynamic: bool = False,
+        background: ColorLike | None = None,
+    ) -> None:
+        self.visor = visor
+        self.dynamic = dynamic
+        self.background = background
+        self.version = 0
+        self._items = items
+        self._rendered: tuple[_TransformKey, int] | None = None
+        self.surface = self._create_surface()
+
+    def _create_surface(self, size: tuple[int, int] | None = None) -> pygame.Surface:
+        if size is None:
+            size = self.visor.screen
+        if self.background is None:
+            return pygame.Surface(size, pygame.SRCALPHA)
+        return pygame.Surface(size)
+
+    def _transform_key(self) -> _TransformKey:
+        return self.visor.transform_version
+
+    def set_items(self, items: LayerItems) -> None:
+        self._items = items
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Mark the content as changed, so the next draw() re-renders the layer."""
+        self.version += 1
+
+    def needs_render(self) -> bool:
+        if self.dynamic or self._rendered is None:
+            return True
+        return self._rendered != (self._transform_key(), self.version)
+
+    def update(self) -> bool:
+        """
+        Re-render the cached surface if required. Returns True if it was re-rendered.
+        """
+        if not self.needs_render():
+            return False
+
+        self._render_into(self.visor)
+        self._rendered = self._transform_key(), self.version
+        return True
+
+    def _render_into(self, visor: Visor) -> None:
+        """Clear the cached surface and render all items with visor, resizing the surface if required."""
+        if self.surface.get_size() != visor.screen:
+            self.surface = self._create_surface(visor.screen)
+
+        if self.background is None:
+            self.surface.fill((0, 0, 0, 0))
+        else:
+            self.surface.fill(self.background)
+
+        if callable(self._items):
+            items = self._items(visor.get_bounding_box())
+        else:
+            items = self._items
+        visor.render(self.surface, items)
+
+    def draw(self, surface: pygame.Surface, dest: Point = (0, 0)) -> bool:
+        """
+        Composite the layer onto the surface using a single blit, re-rendering it first if required.
+        Returns True if the layer was re-rendered.
+        """
+        rendered = self.update()
+        surface.blit(self.surface, dest)
+        return rendered
+
+
+class OverscanLayer(Layer):
+    """
+    A Layer rendered with an extra margin (in screen pixels) around the screen.
+
+    As long as the visor only moves by less than the margin (camera shake, jitter, small lerp steps) and
+    doesn't zoom, draw() just blits a shifted window of the cached buffer instead of re-rendering everything.
+    """
+    margin: int
+
+    def __init__(
+        self,
+        visor: Visor,
+        items: LayerItems = (),
+        *,
+        margin: int = 64,
+        dynamic: bool = False,
+        background: ColorLike | None = None,
+    ) -> None:
+        if margin < 0:
+            raise ValueError(f'margin must not be negative: {margin}')
+        self.margin = margin
+        self._anchor: tuple[float, float] = (0.0, 0.0)
+        super().__init__(visor, items, dynamic=dynamic, background=background)
+
+    def _buffer_size(self) -> tuple[int, int]:
+        sw, sh = self.visor.screen
+        return sw + self.margin * 2, sh + self.margin * 2
+
+    def _create_surface(self, size: tuple[int, int] | None = None) -> pygame.Surface:
+        return super()._create_surface(self._buffer_size() if size is None else size)
+
+    def _transform_key(self) -> _TransformKey:
+        # position is handled by shifting the window, only the zoom, screen, rotation (and re-basing) matter.
+        _, _, w, h = self.visor.region
+        return w, h, self.visor.screen, self.visor.mode, self.visor.rotation, self.visor.origin
+
+    def _offset(self) -> tuple[int, int]:
+        """Offset in screen pixels of the current visor position relative to the buffer."""
+        factor = self.visor.get_scaling_factor()
+        ax, ay = self._anchor
+        rx, ry = self.visor.region.topleft
+        if self.visor.rotation:
+            dx, dy = pygame.Vector2(rx - ax, ry - ay).rotate(self.visor.rotation) * factor
+            return round(dx), round(dy)
+        # the difference of where both put a whole world unit, truncated like world_to_screen, so items
+        # drawn directly on top line up with the buffer (exactly, at integer zoom factors)
+        gx, gy = math.floor(ax), math.floor(ay)
+        return (
+            math.floor((gx - ax) * factor) - math.floor((gx - rx) * factor),
+            math.floor((gy - ay) * factor) - math.floor((gy - ry) * factor),
+        )
+
+    def needs_render(self) -> bool:
+        if super().needs_render():
+            return True
+        dx, dy = self._offset()
+        return abs(dx) > self.margin or abs(dy) > self.margin
+
+    def update(self) -> bool:
+        if not self.needs_render():
+            return False
+
+        factor = self.visor.get_scaling_factor()
+        area = self.visor.get_active_screen_area()
+        bw, bh = self._buffer_size()
+        margin = self.margin / factor
+        # the world area covering the whole screen (including letterbox bars) plus the margin
+        region = (
+            self.visor.region.x - area.x / factor - margin,
+            self.visor.region.y - area.y / factor - margin,
+            bw / factor,
+            bh / factor,
+        )
+        buffer_visor = Visor(VisorMode.RegionLetterbox, (bw, bh), region=region, rotation=self.visor.rotation)
+        buffer_visor.stats = self.visor.stats
+        buffer_visor.chunk_size = self.visor.chunk_size
+        buffer_visor.origin = self.visor.origin
+        self._render_into(buffer_visor)
+
+        self._anchor = self.visor.region.x, self.visor.region.y
+        self._rendered = self._transform_key(), self.version
+        return True
+
+    def draw(self, surface: pygame.Surface, dest: Point = (0, 0)) -> bool:
+        rendered = self.update()
+        dx, dy = self._offset()
+        area = self.visor.get_active_screen_area()
+        if self.visor.mode != VisorMode.RegionLetterbox:
+            area = pygame.Rect((0, 0), self.visor.screen)
+        source = area.move(self.margin + dx, self.margin + dy)
+        surface.blit(self.surface, (dest[0] + area.x, dest[1] + area.y), source)
+        return rendered
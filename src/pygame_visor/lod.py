@@ -0,0 +1,157 @@
+from collections.abc import Generator
+import functools
+import math
+
+import pygame
+from pygame import FRect
+
+from .backend import SurfaceBackend
+from .types import WorldPos, SurfaceItem, SurfaceProvider, Limits
+from .visor import Visor
+
+__all__ = ['LodProvider']
+
+
+class LodProvider:
+    """
+    Level-of-detail helper for far zoomed out views.
+
+    Wraps a surface provider (bbox -> iterable of ((world_x, world_y), surface)) and lazily builds pre-reduced
+    images for square blocks of the world. Level 0 is the provider itself, every following level covers blocks
+    twice the size with the same amount of pixels (a mipmap pyramid). Blocks are built on first use from the
+    four blocks of the level below, and kept in an LRU cache of cache_size blocks (block_size² * 4 bytes each,
+    16 MB for the defaults).
+
+    render() picks the coarsest level whose pixels still map to at least one screen pixel, so the number of
+    items (and scaling work) stays roughly constant no matter how far the visor is zoomed out.
+    With the SurfaceBackend, blocks are scaled into a separate cache of the provider (also cache_size entries),
+    so they don't evict world tiles from the shared scaling cache of the visor.
+
+    Call invalidate() when the world content changes.
+    """
+    provider: SurfaceProvider
+    block_size: int
+    max_level: int
+    origin: WorldPos
+    limits: Limits | None
+
+    def __init__(
+        self,
+        provider: SurfaceProvider,
+        block_size: int = 256,
+        *,
+        max_level: int = 5,
+        origin: WorldPos = (0, 0),
+        limits: Limits | None = None,
+        cache_size: int = 64,
+    ) -> None:
+        if block_size <= 0:
+            raise ValueError(f'block_size must be positive: {block_size}')
+        if max_level < 0:
+            raise ValueError(f'max_level must not be negative: {max_level}')
+        self.provider = provider
+        self.block_size = block_size
+        self.max_level = max_level
+        self.origin = origin
+        self.limits = limits
+        self._get_block = functools.lru_cache(maxsize=cache_size)(self._build_block)
+        self._get_scaled_block = functools.lru_cache(maxsize=cache_size)(self._scale_block)
+
+    @staticmethod
+    def level_scale(level: int) -> int:
+        """World units covered by one pixel of a block at the given level."""
+        return 2 ** level
+
+    def choose_level(self, visor: Visor) -> int:
+        """The coarsest level that still has at least one block pixel per screen pixel."""
+        factor = visor.get_scaling_factor()
+        if factor >= 1.0:
+            return 0
+        level = math.floor(math.log2(1 / factor))
+        return max(0, min(self.max_level, level))
+
+    def block_rect(self, level: int, bx: int, by: int) -> FRect:
+        size = self.block_size * self.level_scale(level)
+        ox, oy = self.origin
+        return FRect(ox + bx * size, oy + by * size, size, size)
+
+    def _in_limits(self, rect: FRect) -> bool:
+        if self.limits is None:
+            return True
+        lx1, ly1, lx2, ly2 = self.limits
+        return rect.colliderect((lx1, ly1, lx2 - lx1, ly2 - ly1))
+
+    def _build_block(self, level: int, bx: int, by: int) -> pygame.Surface:
+        size = self.block_size
+        if level == 0:
+            rect = self.block_rect(0, bx, by)
+            block = pygame.Surface((size, size), pygame.SRCALPHA)
+            for item in self.provider(rect):
+                (wx, wy), surf = item[0], item[1]
+                if len(item) > 2:
+                    rotated = pygame.transform.rotate(surf, item[2])  # type: ignore[misc]
+                    center = wx + surf.get_width() / 2 - rect.x, wy + surf.get_height() / 2 - rect.y
+                    block.blit(rotated, rotated.get_rect(center=center))
+                else:
+                    block.blit(surf, (wx - rect.x, wy - rect.y))
+            return block
+
+        combined = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+        for dy in (0, 1):
+            for dx in (0, 1):
+                cx, cy = bx * 2 + dx, by * 2 + dy
+                if self._in_limits(self.block_rect(level - 1, cx, cy)):
+                    combined.blit(self._get_block(level - 1, cx, cy), (dx * size, dy * size))
+        return pygame.transform.smoothscale(combined, (size, size))
+
+    @staticmethod
+    def _scale_block(block: pygame.Surface, width: int, height: int, fmt: tuple) -> pygame.Surface:
+        scaled = pygame.transform.scale(block, (width, height))
+        if Visor._needs_conversion(scaled, fmt):
+            scaled = scaled.convert(Visor._format_prototype(fmt, True))
+        return scaled
+
+    def get_items(self, bbox: FRect, level: int) -> Generator[SurfaceItem]:
+        """
+        Items covering the bbox at the given level. Level 0 is passed through to the provider.
+        Pass level_scale(level) as world_scale to Visor.render().
+        """
+        if level == 0:
+            yield from self.provider(bbox)
+            return
+
+        size = self.block_size * self.level_scale(level)
+        ox, oy = self.origin
+        left = math.floor((bbox.left - ox) / size)
+        top = math.floor((bbox.top - oy) / size)
+        right = math.ceil((bbox.right - ox) / size)
+        bottom = math.ceil((bbox.bottom - oy) / size)
+
+        for by in range(top, bottom):
+            for bx in range(left, right):
+                rect = self.block_rect(level, bx, by)
+                if self._in_limits(rect):
+                    yield rect.topleft, self._get_block(level, bx, by)
+
+    def render(self, visor: Visor, surface: pygame.Surface) -> int:
+        """
+        Render the visors bounding box at the best level onto surface. Returns the level used.
+        """
+        level = self.choose_level(visor)
+        bbox = visor.get_bounding_box()
+        items = self.get_items(bbox, level)
+        world_scale: float = self.level_scale(level)
+        if level > 0 and isinstance(visor.backend, SurfaceBackend):
+            # blocks are scaled here, the visor draws them 1:1
+            factor = visor.get_scaling_factor()
+            size = math.ceil(self.block_size * world_scale * factor)
+            fmt = Visor._surface_format(surface)
+            items = ((item[0], self._get_scaled_block(item[1], size, size, fmt)) for item in items)
+            world_scale = 1 / factor
+        visor.render(surface, items, world_scale=world_scale)
+        return level
+
+    def invalidate(self) -> None:
+        """Drop all pre-reduced blocks, e.g. after the world changed."""
+        self._get_block.cache_clear()
+        self._get_scaled_block.cache_clear()
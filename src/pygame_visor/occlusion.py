@@ -0,0 +1,58 @@
+import pygame
+
+from .types import ScreenSize
+
+__all__ = ['OcclusionMap']
+
+
+class OcclusionMap:
+    """
+    Coarse screen space coverage bitmap, used by Visor.render(..., occlusion=True).
+
+    The screen is divided into tiles of tile_size pixels, a tile counts as covered once an opaque rect
+    contains it completely. A rect is hidden if all tiles it touches are covered. Each row is a single int
+    bitmask, so both checks are a few integer operations per row.
+    """
+    tile_size: int
+
+    def __init__(self, size: ScreenSize, tile_size: int = 32) -> None:
+        if tile_size <= 0:
+            raise ValueError('tile_size must be positive')
+        self.tile_size = tile_size
+        self._bounds = pygame.Rect((0, 0), size)
+        self._columns = -(-size[0] // tile_size)
+        self._rows: list[int] = [0] * -(-size[1] // tile_size)
+
+    def clear(self) -> None:
+        self._rows = [0] * len(self._rows)
+
+    def cover(self, rect: pygame.Rect) -> None:
+        """Mark all tiles lying completely inside rect as covered."""
+        rect = rect.clip(self._bounds)
+        size = self.tile_size
+        # tiles at the screen edge are only partially visible, reaching the edge is enough for those
+        left = -(-rect.left // size)
+        top = -(-rect.top // size)
+        right = self._columns if rect.right == self._bounds.right else rect.right // size
+        bottom = len(self._rows) if rect.bottom == self._bounds.bottom else rect.bottom // size
+        if left >= right or top >= bottom:
+            return
+        mask = ((1 << (right - left)) - 1) << left
+        rows = self._rows
+        for row in range(top, bottom):
+            rows[row] |= mask
+
+    def is_covered(self, rect: pygame.Rect) -> bool:
+        """True if every tile touched by rect is covered (or rect is completely off screen)."""
+        rect = rect.clip(self._bounds)
+        if not rect:
+            return True
+        size = self.tile_size
+        left = rect.left // size
+        right = (rect.right - 1) // size + 1
+        mask = ((1 << (right - left)) - 1) << left
+        rows = self._rows
+        for row in range((rect.top // size), (rect.bottom - 1) // size + 1):
+            if rows[row] & mask != mask:
+                return False
+        return True
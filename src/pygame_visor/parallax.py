@@ -0,0 +1,127 @@
+from collections.abc import Iterator
+
+import pygame
+from pygame.typing import ColorLike
+
+from .layer import LayerItems, OverscanLayer
+from .types import FloatPair, WorldPos
+from .visor import Visor
+
+__all__ = ['ParallaxLayer', 'ParallaxStack']
+
+
+class ParallaxLayer(OverscanLayer):
+    """
+    An OverscanLayer following a camera Visor at a different speed.
+
+    The layer has its own visor, derived from the camera on every update: its region center is
+    anchor + (camera center - anchor) * scroll (the anchor defaults to the camera center at creation,
+    so all layers start aligned), and its size follows the camera zoom by the zoom factor
+    (1.0 zooms like the camera, 0.0 keeps the size the camera had when the layer was created).
+    A scroll of 0.0 keeps the layer fixed, 1.0 moves it with the camera.
+
+    In floating origin mode the anchor and the camera center are absolute world positions, so the layer doesn't
+    jump when the camera re-bases.
+
+    Items use the coordinates of the layer itself. Since it's an OverscanLayer, small movements only shift the
+    cached buffer, so distant layers are re-rendered only when they moved by more than the margin or zoomed.
+    """
+    camera: Visor
+    scroll: FloatPair
+    zoom: float
+    anchor: FloatPair
+
+    def __init__(
+        self,
+        camera: Visor,
+        items: LayerItems = (),
+        *,
+        scroll: float | FloatPair = 0.5,
+        zoom: float = 1.0,
+        anchor: WorldPos | None = None,
+        margin: int = 64,
+        dynamic: bool = False,
+        background: ColorLike | None = None,
+    ) -> None:
+        self.camera = camera
+        if anchor is None:
+            anchor = self._camera_center()
+        self.scroll = (scroll, scroll) if isinstance(scroll, (int, float)) else (scroll[0], scroll[1])
+        self.zoom = zoom
+        self.anchor = anchor[0], anchor[1]
+        self._reference_size = camera.region.size
+        visor = Visor(camera.mode, camera.screen, region=camera.region, rotation=camera.rotation)
+        super().__init__(visor, items, margin=margin, dynamic=dynamic, background=background)
+        self.sync()
+
+    def _camera_center(self) -> FloatPair:
+        cx, cy = self.camera.region.center
+        ox, oy = self.camera.get_origin_offset()
+        return cx + ox, cy + oy
+
+    def sync(self) -> None:
+        """Derive the region (and screen, mode, rotation) of the layer visor from the camera."""
+        camera = self.camera
+        visor = self.visor
+        visor.mode = camera.mode
+        visor.screen = camera.screen
+        visor.rotation = camera.rotation
+        visor.stats = camera.stats
+
+        ref_w, ref_h = self._reference_size
+        zoom = self.zoom
+        width = ref_w * (camera.region.width / ref_w) ** zoom
+        height = ref_h * (camera.region.height / ref_h) ** zoom
+        cx, cy = self._camera_center()
+        ax, ay = self.anchor
+        sx, sy = self.scroll
+        x = ax + (cx - ax) * sx
+        y = ay + (cy - ay) * sy
+        visor.region.update(x - width / 2, y - height / 2, width, height)
+
+    def update(self) -> bool:
+        self.sync()
+        return super().update()
+
+
+class ParallaxStack:
+    """
+    Parallax layers of one camera, drawn back to front.
+    """
+    camera: Visor
+
+    def __init__(self, camera: Visor) -> None:
+        self.camera = camera
+        self._layers: list[ParallaxLayer] = []
+
+    def add(
+        self,
+        items: LayerItems = (),
+        *,
+        scroll: float | FloatPair = 0.5,
+        zoom: float = 1.0,
+        anchor: WorldPos | None = None,
+        margin: int = 64,
+        dynamic: bool = False,
+        background: ColorLike | None = None,
+    ) -> ParallaxLayer:
+        """Add a layer in front of the existing ones, see ParallaxLayer for the arguments."""
+        layer = ParallaxLayer(
+            self.camera, items,
+            scroll=scroll, zoom=zoom, anchor=anchor, margin=margin, dynamic=dynamic, background=background,
+        )
+        self._layers.append(layer)
+        return layer
+
+    def remove(self, layer: ParallaxLayer) -> None:
+        self._layers.remove(layer)
+
+    def __len__(self) -> int:
+        return len(self._layers)
+
+    def __iter__(self) -> Iterator[ParallaxLayer]:
+        return iter(self._layers)
+
+    def draw(self, surface: pygame.Surface) -> int:
+        """Draw all layers, back to front. Returns the number of layers that had to be re-rendered."""
+        return sum(layer.draw(surface) for layer in self._layers)
@@ -0,0 +1,156 @@
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, NamedTuple
+import functools
+import math
+
+import pygame
+
+from .types import ScreenPos, ScreenRect, SurfaceItem, SurfaceIterable
+
+if TYPE_CHECKING:
+    from .visor import Visor
+
+__all__ = ['PickHit', 'PickIndex']
+
+
+class PickHit(NamedTuple):
+    order: int  # draw order, counted since the last clear()
+    item: SurfaceItem  # the item as it was passed to Visor.render() (chunk positions made local)
+    rect: pygame.Rect  # screen rect the item covers
+
+
+class _Entry(NamedTuple):
+    item: SurfaceItem
+    rect: pygame.Rect  # clipped to the render area
+    bounds: pygame.Rect  # unclipped
+    size: tuple[int, int]  # scaled size, before rotation
+    angle: float
+
+
+class PickIndex:
+    """
+    Screen space index of the items rendered by a Visor, see Visor.enable_picking().
+    Items are stored in a grid of cell_size pixels, so a lookup only tests the items near the position.
+    """
+    cell_size: int
+
+    def __init__(self, cell_size: int = 64) -> None:
+        if cell_size <= 0:
+            raise ValueError('cell_size must be positive')
+        self.cell_size = cell_size
+        self._entries: list[_Entry] = []
+        self._cells: dict[tuple[int, int], list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Forget all recorded items. Call this once per frame, before rendering."""
+        self._entries.clear()
+        self._cells.clear()
+
+    def record(
+        self,
+        visor: 'Visor',
+        surface_iterable: SurfaceIterable,
+        world_scale: float = 1.0,
+    ) -> Iterator[SurfaceItem]:
+        """Pass the items through, adding each to the index where the visor would draw it."""
+        factor = visor.get_scaling_factor() * world_scale
+        area = visor.get_render_area()
+        for item in surface_iterable:
+            world_xy, surf = item[0], item[1]
+            w = math.ceil(surf.get_width() * factor)
+            h = math.ceil(surf.get_height() * factor)
+            if visor.rotation or len(item) > 2:
+                item_angle = item[2] if len(item) > 2 else 0.0  # type: ignore[misc]
+                angle = visor._quantize_angle(item_angle - visor.rotation)
+                rect = visor._rotated_item_rect(world_xy, surf, w, h, angle, world_scale)
+            else:
+                angle = 0.0
+                rect = pygame.Rect(visor.world_to_screen(world_xy), (w, h))
+            self._add(_Entry(item, rect.clip(area), rect, (w, h), angle))
+            yield item
+
+    def _add(self, entry: _Entry) -> None:
+        if not entry.rect:
+            return
+        index = len(self._entries)
+        self._entries.append(entry)
+        for cell in self._cells_for(entry.rect):
+            self._cells.setdefault(cell, []).append(index)
+
+    def _cells_for(self, rect: pygame.Rect) -> Iterator[tuple[int, int]]:
+        size = self.cell_size
+        for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+                yield cx, cy
+
+    def pick(self, pos: ScreenPos, *, pixel: bool = False) -> list[PickHit]:
+        """
+        All items covering the screen position, in draw order (the topmost item is the last one).
+        With pixel=True, transparent pixels (alpha or colorkey) of the items don't count as hits.
+        """
+        x, y = pos
+        size = self.cell_size
+        hits = []
+        for index in self._cells.get((x // size, y // size), ()):
+            entry = self._entries[index]
+            if not entry.rect.collidepoint(x, y):
+                continue
+            if pixel:
+                mask, mx, my = self._entry_mask(entry)
+                mw, mh = mask.get_size()
+                if not (0 <= x - mx < mw and 0 <= y - my < mh and mask.get_at((x - mx, y - my))):
+                    continue
+            hits.append(PickHit(index, entry.item, entry.rect))
+        return hits
+
+    def pick_rect(self, rect: ScreenRect, *, pixel: bool = False) -> list[PickHit]:
+        """
+        All items overlapping the screen rect, in draw order. With pixel=True, only items with at
+        least one opaque pixel inside the rect are returned.
+        """
+        rect = pygame.Rect(rect)
+        if not rect:
+            return []
+        candidates: set[int] = set()
+        for cell in self._cells_for(rect):
+            candidates.update(self._cells.get(cell, ()))
+
+        hits = []
+        for index in sorted(candidates):
+            entry = self._entries[index]
+            if not entry.rect.colliderect(rect):
+                continue
+            if pixel:
+                mask, mx, my = self._entry_mask(entry)
+                area = pygame.Mask(rect.size, fill=True)
+                if mask.overlap(area, (rect.x - mx, rect.y - my)) is None:
+                    continue
+            hits.append(PickHit(index, entry.item, entry.rect))
+        return hits
+
+    def _entry_mask(self, entry: _Entry) -> tuple[pygame.Mask, int, int]:
+        """The mask of the item as drawn, and the screen position of its topleft corner."""
+        mask = self._get_mask(entry.item[1], *entry.size, entry.angle)
+        if entry.angle:
+            rect = mask.get_rect(center=entry.bounds.center)
+            return mask, rect.x, rect.y
+        return mask, entry.bounds.x, entry.bounds.y
+
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _get_mask(surface: pygame.Surface, width: int, height: int, angle: float) -> pygame.Mask:
+        """Mask of the surface scaled to (width, height) and rotated, cached per surface and zoom."""
+        scaled = surface
+        if surface.get_size() != (width, height):
+            scaled = pygame.transform.scale(surface, (width, height))
+        if angle:
+            if not scaled.get_flags() & pygame.SRCALPHA:
+                # so the padded corners of the rotated surface are transparent
+                padded = pygame.Surface(scaled.get_size(), pygame.SRCALPHA)
+                padded.blit(scaled, (0, 0))
+                scaled = padded
+            scaled = pygame.transform.rotate(scaled, angle)
+        return pygame.mask.from_surface(scaled)
@@ -0,0 +1,141 @@
+from collections.abc import Callable
+import time
+
+import pygame
+from pygame.typing import ColorLike
+
+from .types import SurfaceIterable
+from .visor import Visor
+
+__all__ = ['DynamicResolution']
+
+
+class DynamicResolution:
+    """
+    Renders a Visor at an adaptive internal resolution.
+
+    The world is rendered into an offscreen buffer at a fraction (scale) of the screen resolution and then
+    upscaled into the render area of the target surface. Without a background, the buffer is transparent and
+    drawn over what's already on the surface, like Visor.render at full scale. With a background, the render area
+    is filled with it first, at any scale (a bit faster, the buffer doesn't need alpha then).
+
+    The scale is adjusted from the measured render times: it goes down by step when the average exceeds
+    budget_ms, and up again once it's below budget_ms * (1 - hysteresis).
+    After every change at least cooldown frames pass before the next one, so it doesn't oscillate.
+
+    While the visor zooms, the upscale uses cheap nearest-neighbour scaling, once the view settled,
+    smoothscale is used again. At a scale of 1.0 the visor renders directly into the target surface.
+    """
+    visor: Visor
+    scale: float
+    frame_ms: float
+
+    def __init__(
+        self,
+        visor: Visor,
+        *,
+        budget_ms: float = 8.0,
+        min_scale: float = 0.5,
+        max_scale: float = 1.0,
+        step: float = 0.125,
+        hysteresis: float = 0.25,
+        cooldown: int = 30,
+        background: ColorLike | None = None,
+        timer: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        if not 0 < min_scale <= max_scale <= 1.0:
+            raise ValueError(f'Invalid scale range: {min_scale} - {max_scale}')
+        self.visor = visor
+        self.budget_ms = budget_ms
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.step = step
+        self.hysteresis = hysteresis
+        self.cooldown = cooldown
+        self.background = background
+        self.timer = timer
+
+        self.scale = max_scale
+        self.frame_ms = 0.0
+        self._frames_since_change = 0
+        self._last_size = visor.region.size
+        self._inner = Visor(visor.mode, visor.screen, region=visor.region)
+        self._inner.stats = visor.stats
+        self._buffer: pygame.Surface | None = None
+        self._upscaled: pygame.Surface | None = None
+
+    def _buffer_size(self) -> tuple[int, int]:
+        sw, sh = self.visor.screen
+        return max(1, round(sw * self.scale)), max(1, round(sh * self.scale))
+
+    def is_zooming(self) -> bool:
+        """True if the visor region changed its size since the last render."""
+        return self.visor.region.size != self._last_size
+
+    def render(self, surface: pygame.Surface, surface_iterable: SurfaceIterable) -> None:
+        """Same as Visor.render, but at the current internal scale."""
+        zooming = self.is_zooming()
+        self._last_size = self.visor.region.size
+
+        start = self.timer()
+        area = self.visor.get_render_area()
+        if self.background is not None:
+            surface.fill(self.background, area)
+
+        if self.scale >= 1.0:
+            self.visor.render(surface, surface_iterable)
+        else:
+            inner = self._inner
+            inner.mode = self.visor.mode
+            inner.rotation = self.visor.rotation
+            inner.chunk_size = self.visor.chunk_size
+            inner.origin = self.visor.origin
+            inner.region.update(self.visor.region)
+            # not update_screen(), that would clear the scaling cache shared by all visors on every step
+            inner.screen = self._buffer_size()
+
+            buffer = self._get_buffer(surface)
+            inner.render(buffer, surface_iterable)
+            source = buffer.subsurface(inner.get_render_area())
+            smooth = not zooming and self.visor.is_settled()
+            transform = pygame.transform.smoothscale if smooth else pygame.transform.scale
+            if self.background is not None:
+                transform(source, area.size, surface.subsurface(area))
+            else:
+                if self._upscaled is None or self._upscaled.get_size() != area.size:
+                    self._upscaled = pygame.Surface(area.size, pygame.SRCALPHA, 32)
+                transform(source, area.size, self._upscaled)
+                surface.blit(self._upscaled, area)
+        self._adjust((self.timer() - start) * 1000)
+
+    def _get_buffer(self, surface: pygame.Surface) -> pygame.Surface:
+        size = self._inner.screen
+        background = self.background
+        alpha = background is None
+        buffer = self._buffer
+        if buffer is None or buffer.get_size() != size or bool(buffer.get_flags() & pygame.SRCALPHA) != alpha:
+            if alpha:
+                buffer = pygame.Surface(size, pygame.SRCALPHA, 32)
+            else:
+                buffer = pygame.Surface(size, 0, surface)
+            self._buffer = buffer
+        buffer.fill((0, 0, 0, 0) if background is None else background)
+        return buffer
+
+    def _adjust(self, elapsed_ms: float) -> None:
+        if self.frame_ms == 0.0:
+            self.frame_ms = elapsed_ms
+        else:
+            self.frame_ms += (elapsed_ms - self.frame_ms) * 0.2
+
+        self._frames_since_change += 1
+        if self._frames_since_change < self.cooldown:
+            return
+
+        if self.frame_ms > self.budget_ms and self.scale > self.min_scale:
+            self.scale = max(self.min_scale, self.scale - self.step)
+        elif self.frame_ms < self.budget_ms * (1 - self.hysteresis) and self.scale < self.max_scale:
+            self.scale = min(self.max_scale, self.scale + self.step)
+        else:
+            return
+        self._frames_since_change = 0
@@ -0,0 +1,142 @@
+import math
+from typing import Any
+
+import pygame
+
+from .backend import SurfaceBackend
+from .visor import Visor
+
+__all__ = ['VisorGroup']
+
+
+class VisorGroup(pygame.sprite.LayeredUpdates):
+    """
+    A LayeredUpdates group, that draws its sprites through a Visor.
+
+    sprite.rect is used as world coordinates, sprite.image at world scale (like the surfaces passed to
+    Visor.render). Sprites outside the visors bounding box are culled, images are scaled through the shared
+    scaling cache of the Visor and all blits are done in a single batch.
+
+    draw() returns the changed screen rects, like LayeredDirty: sprites that moved, changed their image, have
+    a truthy dirty attribute or got removed. If the visor itself changed, the whole render area is returned.
+    Sprites with a visible attribute of 0 are skipped.
+
+    Like Visor.render, drawn sprites are recorded in visor.pick_index (as (rect.topleft, image) items) and
+    draw(occlusion=True) culls sprites hidden behind opaque ones. In floating origin mode sprite rects are
+    relative to visor.origin, rebase them along with the visor.
+    """
+
+    # spritedict holds the last drawn screen rects, this one for sprites not drawn (yet)
+    _undrawn = pygame.Rect(0, 0, 0, 0)
+
+    spritedict: dict[pygame.sprite.Sprite, pygame.Rect]  # type: ignore[assignment]
+    lostsprites: list[pygame.Rect]  # type: ignore[assignment]
+
+    def __init__(self, *sprites: pygame.sprite.Sprite, **kwargs: Any) -> None:
+        self._images: dict[pygame.sprite.Sprite, pygame.Surface] = {}
+        self._drawn_version: int | None = None
+        super().__init__(*sprites, **kwargs)
+
+    def add_internal(self, sprite: pygame.sprite.Sprite, layer: int | None = None) -> None:
+        super().add_internal(sprite, layer)
+        self.spritedict[sprite] = self._undrawn
+
+    def remove_internal(self, sprite: pygame.sprite.Sprite) -> None:
+        old_rect = self.spritedict[sprite]
+        lost = len(self.lostsprites)
+        super().remove_internal(sprite)
+        # sprite.rect is in world coordinates, only the last drawn screen rect is dirty.
+        del self.lostsprites[lost:]
+        if old_rect is not self._undrawn:
+            self.lostsprites.append(old_rect)
+        self._images.pop(sprite, None)
+
+    def draw(  # type: ignore[override]
+        self,
+        surface: pygame.Surface,
+        visor: Visor,
+        special_flags: int = 0,
+        occlusion: bool = False,
+    ) -> list[pygame.Rect]:
+        area = visor.get_render_area()
+        bbox = visor.get_bounding_box()
+        version = visor.transform_version
+        full_redraw = version != self._drawn_version
+        self._drawn_version = version
+
+        if occlusion or visor.rotation or not isinstance(visor.backend, SurfaceBackend):
+            # no batching possible, let the visor handle it.
+            sprites = self.sprites()
+            items = [
+                (spr.rect.topleft, spr.image)
+                for spr in sprites
+                if getattr(spr, 'visible', 1) and bbox.colliderect(spr.rect)
+            ]
+            visor.stats.culled += len(sprites) - len(items)
+            visor.render(surface, items, occlusion=occlusion)
+            self.lostsprites = []
+            return [area]
+
+        spritedict = self.spritedict
+        undrawn = self._undrawn
+        images = self._images
+        dirty: list[pygame.Rect] = self.lostsprites
+        self.lostsprites = []
+
+        subsurface = surface.subsurface(area) if area != surface.get_rect() else surface
+        fmt = visor._surface_format(subsurface)
+        factor = visor.get_scaling_factor()
+        scale = not math.isclose(factor, 1.0)
+        # same as Visor.world_to_screen, but only calculated once
+        rx, ry = visor.region.topleft
+        ws_x, ws_y = visor.get_active_screen_area().topleft
+
+        blits: list[tuple[pygame.Surface, tuple[int, int]]] = []
+        drawn: list[tuple[tuple[int, int], pygame.Surface]] = []
+        for spr in self.sprites():
+            old_rect = spritedict[spr]
+            rect = spr.rect
+            if not getattr(spr, 'visible', 1) or not bbox.colliderect(rect):
+                if old_rect is not undrawn:
+                    dirty.append(old_rect)
+                    spritedict[spr] = undrawn
+                continue
+
+            image = spr.image
+            if scale:
+                image = visor._scale_item_surface(image, factor, fmt)
+            else:
+                image = visor._unscaled_item_surface(image, fmt)
+
+            x = int((rect.x - rx) * factor + ws_x)
+            y = int((rect.y - ry) * factor + ws_y)
+            blits.append((image, (x - area.x, y - area.y)))
+            drawn.append((rect.topleft, spr.image))
+            new_rect = pygame.Rect((x, y), image.get_size())
+
+            changed = getattr(spr, 'dirty', 0) or images.get(spr) is not spr.image
+            if old_rect is undrawn:
+                dirty.append(new_rect)
+            elif changed or new_rect != old_rect:
+                if new_rect.colliderect(old_rect):
+                    dirty.append(new_rect.union(old_rect))
+                else:
+                    dirty.append(new_rect)
+                    dirty.append(old_rect)
+            if getattr(spr, 'dirty', 0) == 1:
+                spr.dirty = 0
+            spritedict[spr] = new_rect
+            images[spr] = spr.image
+
+        subsurface.fblits(blits, special_flags)
+        if visor.pick_index is not None:
+            # the same entries Visor.render would record
+            for _ in visor.pick_index.record(visor, drawn):
+                pass
+        visor.stats.items += len(blits)
+        visor.stats.blits += len(blits)
+        visor.stats.culled += len(spritedict) - len(blits)
+
+        if full_redraw:
+            return [area]
+        return [rect.clip(area) for rect in dirty]
@@ -1,5 +1,10 @@
-from typing import TypeGuard, Iterable
+from typing import TYPE_CHECKING, TypeGuard, Iterable, Callable
 from pygame import Vector2, Rect, FRect, Surface
+from pygame._sdl2.video import Texture
+
+if TYPE_CHECKING:
+    # only type checked (against 3.13), typing.TypeIs doesn't exist at runtime on 3.12
+    from typing import TypeIs
 
 __all__ = [
     'IntPair', 'FloatPair',
@@ -9,7 +14,9 @@ __all__ = [
     'WorldRect', 'ScreenRect',
     'is_screen_rect', 'is_screen_size',
     'is_world_rect', 'is_world_size',
-    'SurfaceIterable',
+    'ChunkPos', 'is_chunk_pos',
+    'SurfaceItem', 'SurfaceIterable', 'SurfaceProvider',
+    'RenderTarget',
     'Limits', 'is_limits',
 ]
 
@@ -21,16 +28,27 @@ type FloatQuad = tuple[float, float, float, float]
 type WorldPos = IntPair | FloatPair | Vector2
 type ScreenPos = IntPair
 
+# ((chunk_x, chunk_y), (local_x, local_y)) - world position in floating origin mode (see Visor chunk_size)
+type ChunkPos = tuple[IntPair, FloatPair | IntPair]
+
 type WorldSize = IntPair | FloatPair | Vector2
 type ScreenSize = IntPair
 
 type WorldRect = IntPair | FloatPair | IntQuad | FloatQuad | Rect | FRect
 type ScreenRect = IntPair | IntQuad | Rect
 
-type SurfaceIterable = Iterable[tuple[WorldPos, Surface]]
+# ((world_x, world_y), surface) with an optional counter-clockwise rotation in degrees
+type SurfaceItem = tuple[WorldPos, Surface] | tuple[WorldPos, Surface, float]
+type SurfaceIterable = Iterable[SurfaceItem]
+
+# Called with the world bounding box, returns the surfaces covering it.
+type SurfaceProvider = Callable[[FRect], SurfaceIterable]
 
 type Limits = IntQuad | FloatQuad
 
+# What a Visor renders into, depending on its backend. None is the window of a TextureBackend.
+type RenderTarget = Surface | Texture | None
+
 
 def is_screen_rect(s: ScreenRect) -> TypeGuard[IntQuad | Rect]:
     return len(s) == 4
@@ -48,5 +66,10 @@ def is_world_size(s: WorldRect) -> TypeGuard[WorldSize]:
     return len(s) == 2
 
 
+def is_chunk_pos(s: WorldPos | ChunkPos) -> 'TypeIs[ChunkPos]':
+    # checked structurally, plain positions may use any numeric type (e.g. numpy scalars or Fractions)
+    return len(s) == 2 and hasattr(s[0], '__len__') and len(s[0]) == 2
+
+
 def is_limits(s: Limits) -> TypeGuard[IntQuad | FloatQuad]:
     return len(s) == 4 and isinstance(s, tuple) and all(isinstance(v, (int, float)) for v in s)
@@ -1,19 +1,35 @@
+from collections import OrderedDict
 from enum import Enum, auto
+from collections.abc import Callable, Iterable, Iterator
+from typing import NamedTuple
 import math
 import functools
+import time
+import warnings
+import weakref
 
 import pygame
 from pygame import FRect
-from pygame.typing import RectLike
+from pygame.typing import ColorLike, RectLike
 
+from .animation import Animation, AnimationFrame
+from .backend import RenderBackend, SurfaceBackend
+from .occlusion import OcclusionMap
+from .pick import PickHit, PickIndex
 from .types import (
+    RenderTarget, IntPair,
+    WorldRect, is_world_rect,
     WorldPos, ScreenPos, ScreenSize, ScreenRect,
-    SurfaceIterable,
+    ChunkPos, is_chunk_pos,
+    SurfaceItem, SurfaceIterable,
     is_screen_rect, is_screen_size,
     Limits, is_limits,
 )
 
-__all__ = ['VisorMode', 'Visor']
+__all__ = ['VisorMode', 'Visor', 'ScalingCacheStats', 'RenderStats']
+
+# (bitsize, (rmask, gmask, bmask)) - alpha is handled separately per source surface
+type _SurfaceFormat = tuple[int, tuple[int, int, int]]
 
 
 class VisorMode(Enum):
@@ -21,17 +37,84 @@ class VisorMode(Enum):
     RegionExpand = auto()
 
 
+class ScalingCacheStats(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int | None
+    currsize: int
+    unconverted: int  # cache misses whose source was not in the destination pixel format
+
+
+class RenderStats:
+    """
+    Counters of a Visor, filled while rendering. They add up until reset() is called, usually once per frame.
+    """
+    __slots__ = ('items', 'blits', 'culled')
+    items: int  # items passed to render()
+    blits: int  # surfaces actually drawn
+    culled: int  # items skipped by helpers (VisorGroup, Compositor), because they're out of view
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.items = 0
+        self.blits = 0
+        self.culled = 0
+
+
 class Visor:
     mode: VisorMode
     screen: ScreenSize
     region: FRect
     limits: Limits | None
+    backend: RenderBackend
+    # records rendered items for pick()/pick_rect(), None unless enable_picking() was called
+    pick_index: PickIndex | None
+    stats: RenderStats
+    # floating origin mode: the region (and all plain world positions) are relative to
+    # origin * chunk_size. None disables it, the origin then stays at (0, 0).
+    chunk_size: int | None
+    origin: tuple[int, int]
+    # counter-clockwise camera rotation in degrees around the region center,
+    # the world appears rotated clockwise on screen.
+    rotation: float
+
+    # rotated surfaces are cached for angles rounded to multiples of this (in degrees)
+    rotation_step: float = 1.0
+    # font sizes of text scaled with the zoom are rounded to multiples of this
+    text_size_step: int = 2
+    # screen tile size of the coverage bitmap used by render(..., occlusion=True)
+    occlusion_tile_size: int = 32
 
-    def __init__(self, mode: VisorMode, screen: ScreenRect, *, region: RectLike, limits: Limits | None = None) -> None:
+    def __init__(
+        self,
+        mode: VisorMode,
+        screen: ScreenRect,
+        *,
+        region: RectLike,
+        limits: Limits | None = None,
+        backend: RenderBackend | None = None,
+        rotation: float = 0.0,
+        chunk_size: int | None = None,
+    ) -> None:
+        if chunk_size is not None and chunk_size <= 0:
+            raise ValueError('chunk_size must be positive')
         self.mode = mode
         self.screen = self._screen_size(screen)
         self.region = FRect(region)
+        self.rotation = rotation
+        self.chunk_size = chunk_size
+        self.origin = (0, 0)
         self.set_limits(limits)
+        self.backend = backend if backend is not None else SurfaceBackend()
+        self._version = 0
+        self._version_key = self._transform_key()
+        self._lerp_target: tuple[float, float] | None = None
+        self.pick_index = None
+        self.stats = RenderStats()
+        self._previous_state: tuple[FRect, float] | None = None
+        self._interpolated: Visor | None = None
 
     def set_limits(self, limits: Limits | None) -> None:
         if limits is not None and not is_limits(limits):
@@ -48,15 +131,148 @@ class Visor:
         if old_screen != self.screen:
             self.clear_scaling_cache()
 
-    def lerp_to(self, pos: WorldPos, weight: float = 1.0) -> None:
+    def _transform_key(self) -> tuple[float, float, float, float, int, int, VisorMode, float, tuple[int, int]]:
+        x, y, w, h = self.region
+        sw, sh = self.screen
+        return x, y, w, h, sw, sh, self.mode, self.rotation, self.origin
+
+    @property
+    def transform_version(self) -> int:
+        """
+        Monotonically increasing number, that changes whenever the region, screen or mode changed.
+        Also catches changes made to the region directly (e.g. region.move_ip()).
+        Compare it with the value from your last frame, to skip redrawing a static view.
+        """
+        key = self._transform_key()
+        if key != self._version_key:
+            self._version_key = key
+            self._version += 1
+        return self._version
+
+    def is_settled(self, epsilon: float | None = None) -> bool:
+        """
+        True if there is no ongoing lerp_to() movement, or the region is within epsilon world units
+        of its target. Defaults to half a screen pixel.
+        """
+        if self._lerp_target is None:
+            return True
+        if epsilon is None:
+            epsilon = 0.5 / self.get_scaling_factor()
+        tx, ty = self._lerp_target
+        cx, cy = self.region.center
+        return math.hypot(tx - cx, ty - cy) <= epsilon
+
+    def lerp_to(self, pos: WorldPos | ChunkPos, weight: float = 1.0, *, snap: float = 0.5) -> None:
+        """
+        Move towards pos by weight. Once the remaining distance is below snap screen pixels,
+        the region snaps to the target, so the view stops changing.
+        """
+        if self.chunk_size is not None:
+            pos = self._local_target(pos)
+        assert not is_chunk_pos(pos), 'Chunk positions need a chunk_size'
+        target = FRect(self.region)
+        target.center = pos[0], pos[1]
+        self._clamp(target)
+        tx, ty = target.center
+
         px, py = pos
         cx, cy = self.region.center
         x = pygame.math.lerp(cx, px, weight)
         y = pygame.math.lerp(cy, py, weight)
-        self.move_to((x, y))
+        self._move_to((x, y))
+
+        cx, cy = self.region.center
+        if math.hypot(tx - cx, ty - cy) * self.get_scaling_factor() <= snap:
+            self.region.center = tx, ty
+        self._lerp_target = tx, ty
+        self.rebase()
+
+    def move_to(self, pos: WorldPos | ChunkPos) -> None:
+        self._lerp_target = None
+        if self.chunk_size is not None:
+            pos = self._local_target(pos)
+        assert not is_chunk_pos(pos), 'Chunk positions need a chunk_size'
+        self._move_to(pos)
+        self.rebase()
+
+    def _local_target(self, pos: WorldPos | ChunkPos) -> tuple[float, float]:
+        """Local position of a movement target, re-based first if it's far away (so it fits into the FRect)."""
+        x, y = self.to_local(pos)
+        shift_x, shift_y = self._rebase_around(x, y)
+        return x - shift_x, y - shift_y
+
+    def to_local(self, pos: WorldPos | ChunkPos) -> WorldPos:
+        """
+        Position relative to the current origin (the coordinates region uses). Plain positions
+        already are, (chunk, local) positions are converted.
+        """
+        if not is_chunk_pos(pos):
+            return pos
+        if self.chunk_size is None:
+            raise ValueError('Chunk positions are only supported with a chunk_size')
+        (cx, cy), (lx, ly) = pos
+        ox, oy = self.origin
+        return (cx - ox) * self.chunk_size + lx, (cy - oy) * self.chunk_size + ly
 
-    def move_to(self, pos: WorldPos) -> None:
-        self.region.center = pos[0], pos[1]
+    def to_chunk(self, pos: WorldPos) -> ChunkPos:
+        """Inverse of to_local(), e.g. for positions returned by screen_to_world()."""
+        if self.chunk_size is None:
+            raise ValueError('Chunk positions are only supported with a chunk_size')
+        size = self.chunk_size
+        x, y = pos
+        ox, oy = self.origin
+        dx, lx = divmod(x, size)
+        dy, ly = divmod(y, size)
+        return (ox + int(dx), oy + int(dy)), (lx, ly)
+
+    def get_origin_offset(self) -> IntPair:
+        """The origin in world units (origin * chunk_size), add it to local positions to get absolute ones."""
+        if self.chunk_size is None:
+            return 0, 0
+        ox, oy = self.origin
+        return ox * self.chunk_size, oy * self.chunk_size
+
+    def rebase(self) -> bool:
+        """
+        In floating origin mode, move the origin to the chunk of the region center once the center is more than
+        one chunk outside of the origin chunk. The region, limits and targets are shifted along, so they stay
+        small and precise. Plain (local) positions you stored become invalid by that, use (chunk, local)
+        positions for everything that lives longer than a frame. Returns True if the origin changed.
+        """
+        cx, cy = self.region.center
+        return self._rebase_around(cx, cy) != (0, 0)
+
+    def _rebase_around(self, x: float, y: float) -> tuple[int, int]:
+        """Re-base, if the local position (x, y) is too far from the origin. Returns the shift in world units."""
+        if self.chunk_size is None:
+            return 0, 0
+        size = self.chunk_size
+        dx, dy = math.floor(x / size), math.floor(y / size)
+        if -1 <= dx <= 1 and -1 <= dy <= 1:
+            return 0, 0
+
+        ox, oy = self.origin
+        self.origin = ox + dx, oy + dy
+        shift_x, shift_y = dx * size, dy * size
+        self.region.move_ip(-shift_x, -shift_y)
+        if self.limits is not None:
+            lx1, ly1, lx2, ly2 = self.limits
+            self.limits = lx1 - shift_x, ly1 - shift_y, lx2 - shift_x, ly2 - shift_y
+        if self._lerp_target is not None:
+            tx, ty = self._lerp_target
+            self._lerp_target = tx - shift_x, ty - shift_y
+        if self._previous_state is not None:
+            previous, rotation = self._previous_state
+            self._previous_state = previous.move(-shift_x, -shift_y), rotation
+        return shift_x, shift_y
+
+    def _move_to(self, pos: WorldPos) -> None:
+        # assigning center moves relative to the old one, which loses precision after a large re-base
+        self.region.topleft = pos[0] - self.region.width / 2, pos[1] - self.region.height / 2
+        self._clamp(self.region)
+
+    def _clamp(self, region: FRect) -> None:
+        """Keep region within the limits (in-place)."""
         if self.limits is None:
             return
 
@@ -65,19 +281,63 @@ class Visor:
         l_width = abs(lx2 - lx1)
         l_height = abs(ly2 - ly1)
 
-        if l_width < self.region.width:
-            self.region.centerx = lx1 + l_width / 2
-        elif self.region.left < lx1:
-            self.region.left = lx1
-        elif self.region.right > lx2:
-            self.region.right = lx2
+        if l_width < region.width:
+            region.centerx = lx1 + l_width / 2
+        elif region.left < lx1:
+            region.left = lx1
+        elif region.right > lx2:
+            region.right = lx2
+
+        if l_height < region.height:
+            region.centery = ly1 + l_height / 2
+        elif region.top < ly1:
+            region.top = ly1
+        elif region.bottom > ly2:
+            region.bottom = ly2
+
+    def tick(self) -> None:
+        """
+        Start a fixed simulation step: remembers the current region and rotation as the previous state.
+        Move/zoom/rotate the visor after calling it (once per tick), and render through interpolated(alpha).
+        """
+        self._previous_state = FRect(self.region), self.rotation
+
+    def interpolated(self, alpha: float) -> 'Visor':
+        """
+        A view between the state before the last tick() (alpha=0.0) and the current state (alpha=1.0), usually
+        the time accumulated since the last tick divided by the tick length. Use it for get_bounding_box(),
+        render() and the coordinate conversions of that frame. The same view object is reused and updated by
+        every call, it shares backend, stats and pick_index with this visor.
+        """
+        view = self._interpolated
+        if view is None:
+            view = self._interpolated = Visor(self.mode, self.screen, region=self.region)
+        view.mode = self.mode
+        view.screen = self.screen
+        view.backend = self.backend
+        view.stats = self.stats
+        view.pick_index = self.pick_index
+        view.chunk_size = self.chunk_size
+        view.origin = self.origin
+
+        if self._previous_state is None:
+            view.region.update(self.region)
+            view.rotation = self.rotation
+            return view
 
-        if l_height < self.region.height:
-            self.region.centery = ly1 + l_height / 2
-        elif self.region.top < ly1:
-            self.region.top = ly1
-        elif self.region.bottom > ly2:
-            self.region.bottom = ly2
+        previous, previous_rotation = self._previous_state
+        current = self.region
+        lerp = pygame.math.lerp
+        view.region.update(
+            lerp(previous.x, current.x, alpha),
+            lerp(previous.y, current.y, alpha),
+            lerp(previous.width, current.width, alpha),
+            lerp(previous.height, current.height, alpha),
+        )
+        # the shorter way around
+        delta = (self.rotation - previous_rotation + 180) % 360 - 180
+        view.rotation = (previous_rotation + delta * alpha) % 360
+        return view
 
     def scale_by_at(self, factor: int | float, pos: WorldPos | None = None) -> None:
         """Scale (zoom in/out) by factor around the given world pos. If None, center is used."""
@@ -110,7 +370,22 @@ class Visor:
     def get_bounding_box(self) -> FRect:
         """
         Return the world region that needs to be rendered for display.
+        If the visor is rotated, this is the axis aligned hull of the rotated view.
         """
+        bbox = self._get_unrotated_bounding_box()
+        if not self.rotation:
+            return bbox
+
+        center = pygame.Vector2(self.region.center)
+        corners = [
+            (pygame.Vector2(corner) - center).rotate(-self.rotation) + center
+            for corner in (bbox.topleft, bbox.topright, bbox.bottomleft, bbox.bottomright)
+        ]
+        left = min(c.x for c in corners)
+        top = min(c.y for c in corners)
+        return FRect(left, top, max(c.x for c in corners) - left, max(c.y for c in corners) - top)
+
+    def _get_unrotated_bounding_box(self) -> FRect:
         sw, sh = self.screen
 
         if self.mode == VisorMode.RegionLetterbox:
@@ -169,6 +444,14 @@ class Visor:
 
         return pygame.Rect(left, top, ws_width, ws_height)
 
+    def get_render_area(self) -> pygame.Rect:
+        """
+        The screen rect render() draws into. The active area in RegionLetterbox, otherwise the whole screen.
+        """
+        if self.mode == VisorMode.RegionLetterbox:
+            return self.get_active_screen_area()
+        return pygame.Rect((0, 0), self.screen)
+
     def screen_to_world(self, screen_pos: ScreenPos) -> pygame.Vector2 | None:
         """May return None in RegionLetterbox, if the pos is outside the bounding box"""
         # ViewMode.RegionLetterbox
@@ -179,7 +462,16 @@ class Visor:
 
         sx, sy = screen_pos
         factor = self.get_scaling_factor()
-        ws_x, ws_y, _, _ = self.get_active_screen_area()
+        active_area = self.get_active_screen_area()
+        ws_x, ws_y, _, _ = active_area
+
+        if self.rotation:
+            px, py = self._screen_pivot()
+            dx, dy = pygame.Vector2(sx - px, sy - py).rotate(-self.rotation) / factor
+            wx, wy = self.region.centerx + dx, self.region.centery + dy
+            if self.mode == VisorMode.RegionLetterbox and not active_area.collidepoint(sx, sy):
+                return None
+            return pygame.Vector2(wx, wy)
 
         wx = (sx - ws_x) / factor + self.region.x
         wy = (sy - ws_y) / factor + self.region.y
@@ -192,25 +484,256 @@ class Visor:
 
         return pygame.Vector2(wx, wy)
 
-    def world_to_screen(self, world_pos: WorldPos) -> ScreenPos:
+    def world_to_screen(self, world_pos: WorldPos | ChunkPos) -> ScreenPos:
         # ViewMode.RegionLetterbox
         # region = (0, 0, 400, 300)
         # screen_rect = (0, 0, 1920, 1080)   -- region scaled to: (1440, 1080)
         # world_pos = (40, 30)               -- (10% of 400; 10% of 300)
         # expected screen_pos = (384, 108)   -- 240 + 144  (240 padding + 10% of 1440; 10% of 1080)
 
+        if self.chunk_size is not None:
+            world_pos = self.to_local(world_pos)
+        sx, sy = self._world_to_screen(world_pos)  # type: ignore[arg-type]
+        return int(sx), int(sy)
+
+    def _world_to_screen(self, world_pos: WorldPos) -> tuple[float, float]:
+        """Same as world_to_screen, without rounding."""
+        wx, wy = world_pos
+        factor = self.get_scaling_factor()
+
+        if self.rotation:
+            px, py = self._screen_pivot()
+            dx, dy = pygame.Vector2(wx - self.region.centerx, wy - self.region.centery).rotate(self.rotation) * factor
+            return px + dx, py + dy
+
+        ws_x, ws_y, _, _ = self.get_active_screen_area()
+        return (wx - self.region.x) * factor + ws_x, (wy - self.region.y) * factor + ws_y
+
+    def _item_center(
+        self,
+        world_pos: WorldPos,
+        surface: pygame.Surface,
+        world_scale: float = 1.0,
+    ) -> tuple[float, float]:
+        """Screen position of the center of a surface placed at world_pos."""
         wx, wy = world_pos
+        return self._world_to_screen((
+            wx + surface.get_width() * world_scale / 2,
+            wy + surface.get_height() * world_scale / 2,
+        ))
+
+    def _rotated_item_rect(
+        self,
+        world_pos: WorldPos,
+        surface: pygame.Surface,
+        width: int,
+        height: int,
+        angle: float,
+        world_scale: float = 1.0,
+    ) -> pygame.Rect:
+        """Screen rect covered by a surface scaled to (width, height) and rotated by angle around its center."""
+        cx, cy = self._item_center(world_pos, surface, world_scale)
+        rad = math.radians(angle)
+        cos, sin = abs(math.cos(rad)), abs(math.sin(rad))
+        # the rotated surface is rounded up, a pixel of slack on each side covers that
+        rect = pygame.Rect(0, 0, math.ceil(width * cos + height * sin) + 2, math.ceil(width * sin + height * cos) + 2)
+        rect.center = round(cx), round(cy)
+        return rect
+
+    def _transform_points(self, points: Iterable[WorldPos]) -> list[tuple[float, float]]:
+        """world_to_screen for many points at once, without rounding."""
+        factor = self.get_scaling_factor()
+        if self.rotation:
+            px, py = self._screen_pivot()
+            cx, cy = self.region.center
+            angle = math.radians(self.rotation)
+            cos = math.cos(angle) * factor
+            sin = math.sin(angle) * factor
+            return [
+                (px + (x - cx) * cos - (y - cy) * sin, py + (x - cx) * sin + (y - cy) * cos)
+                for x, y in points
+            ]
+
+        ws_x, ws_y, _, _ = self.get_active_screen_area()
+        ox = ws_x - self.region.x * factor
+        oy = ws_y - self.region.y * factor
+        return [(x * factor + ox, y * factor + oy) for x, y in points]
+
+    def _screen_pivot(self) -> tuple[float, float]:
+        """Screen position of the region center, which the view rotates around."""
         factor = self.get_scaling_factor()
         ws_x, ws_y, _, _ = self.get_active_screen_area()
+        return self.region.width / 2 * factor + ws_x, self.region.height / 2 * factor + ws_y
 
-        sx = int((wx - self.region.x) * factor + ws_x)
-        sy = int((wy - self.region.y) * factor + ws_y)
+    _unconverted_sources: int = 0
+    _warned_unconverted: bool = False
 
-        return sx, sy
+    # scaled surfaces by (source, width, height, format) while they're alive, to find cached ones without
+    # creating cache entries (see render with budget_ms)
+    _scaled_index: weakref.WeakValueDictionary[
+        tuple[pygame.Surface, int, int, _SurfaceFormat | None], pygame.Surface
+    ] = weakref.WeakValueDictionary()
+    # most recently used scaled version per source surface, stretched by budgeted renders (see render)
+    _recent_scaled: OrderedDict[pygame.Surface, tuple[tuple[int, int], pygame.Surface]] = OrderedDict()
+    _recent_scaled_maxsize: int = 64
+    # everything the scaling caches created and still alive, to measure their memory use
+    _cached_surfaces: weakref.WeakSet[pygame.Surface] = weakref.WeakSet()
 
+    @staticmethod
+    def _surface_format(surface: pygame.Surface) -> _SurfaceFormat:
+        r, g, b, _ = surface.get_masks()
+        return surface.get_bitsize(), (r, g, b)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _format_prototype(fmt: _SurfaceFormat, alpha: bool) -> pygame.Surface:
+        """Tiny surface with the given format, only used as target for Surface.convert()."""
+        bitsize, (r, g, b) = fmt
+        if alpha and bitsize != 32:
+            # per pixel alpha needs 32 bits
+            return pygame.Surface((1, 1), pygame.SRCALPHA, 32)
+        if alpha:
+            return pygame.Surface((1, 1), pygame.SRCALPHA, 32, (r, g, b, 0xFFFFFFFF & ~(r | g | b)))
+        return pygame.Surface((1, 1), 0, bitsize, (r, g, b, 0))
+
+    @classmethod
+    def _needs_conversion(cls, surface: pygame.Surface, fmt: _SurfaceFormat) -> bool:
+        per_pixel_alpha = surface.get_flags() & pygame.SRCALPHA
+        # per pixel alpha can't be kept on destinations with less than 32 bits, nothing to match there.
+        return (not per_pixel_alpha or fmt[0] == 32) and cls._surface_format(surface) != fmt
+
+    @classmethod
+    def _convert_to_format(cls, surface: pygame.Surface, fmt: _SurfaceFormat) -> pygame.Surface:
+        """
+        Convert surface to the destination format, so blits don't need per pixel conversion.
+        Colorkey and alpha surfaces are additionally RLE accelerated.
+        """
+        per_pixel_alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+        if cls._needs_conversion(surface, fmt):
+            cls._unconverted_sources += 1
+            if not cls._warned_unconverted:
+                cls._warned_unconverted = True
+                warnings.warn(
+                    'Surfaces passed to Visor.render() do not match the destination pixel format. '
+                    'Use convert()/convert_alpha() on them for faster blits. '
+                    'See Visor.get_scaling_cache_stats().unconverted',
+                    RuntimeWarning,
+                    stacklevel=4,
+                )
+            surface = surface.convert(cls._format_prototype(fmt, per_pixel_alpha))
+
+        colorkey = surface.get_colorkey()
+        alpha = surface.get_alpha()
+        if colorkey is not None:
+            surface.set_colorkey(colorkey, pygame.RLEACCEL)
+        elif per_pixel_alpha or alpha is not None:
+            surface.set_alpha(255 if alpha is None else alpha, pygame.RLEACCEL)
+        return surface
+
+    @staticmethod
     @functools.lru_cache(maxsize=20)
-    def _get_scaled_surface(self, surface: pygame.Surface, width: int, heigth: int) -> pygame.Surface:
-        return pygame.transform.scale(surface, (width, heigth))
+    def _get_scaled_surface(
+        surface: pygame.Surface,
+        width: int,
+        heigth: int,
+        fmt: _SurfaceFormat | None = None,
+    ) -> pygame.Surface:
+        scaled = pygame.transform.scale(surface, (width, heigth))
+        if fmt is not None:
+            scaled = Visor._convert_to_format(scaled, fmt)
+        Visor._cached_surfaces.add(scaled)
+        Visor._scaled_index[surface, width, heigth, fmt] = scaled
+        return scaled
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _get_converted_surface(surface: pygame.Surface, fmt: _SurfaceFormat) -> pygame.Surface:
+        """Unscaled source converted to the destination format, see _unscaled_item_surface()."""
+        converted = Visor._convert_to_format(surface, fmt)
+        Visor._cached_surfaces.add(converted)
+        return converted
+
+    def _unscaled_item_surface(self, surface: pygame.Surface, fmt: _SurfaceFormat) -> pygame.Surface:
+        """A surface passed to render() drawn at its original size, converted (once) if its format doesn't match."""
+        if self._needs_conversion(surface, fmt):
+            return self._get_converted_surface(surface, fmt)
+        return surface
+
+    @staticmethod
+    @functools.lru_cache(maxsize=32)
+    def _get_scaled_frames(
+        animation: Animation,
+        factor: float,
+        fmt: _SurfaceFormat | None = None,
+    ) -> tuple[pygame.Surface, ...]:
+        """All frames of an animation scaled by factor, cached as one entry per animation and zoom level."""
+        return tuple(
+            Visor._get_scaled_surface.__wrapped__(  # type: ignore[attr-defined]
+                frame, math.ceil(frame.get_width() * factor), math.ceil(frame.get_height() * factor), fmt,
+            )
+            for frame in animation.frames
+        )
+
+    def _scale_item_surface(
+        self,
+        surface: pygame.Surface,
+        factor: float,
+        fmt: _SurfaceFormat | None = None,
+    ) -> pygame.Surface:
+        """Scaled version of a surface passed to render(), animation frames are scaled per animation."""
+        if isinstance(surface, AnimationFrame):
+            return self._get_scaled_frames(surface.animation, factor, fmt)[surface.index]
+        w = math.ceil(surface.get_width() * factor)
+        h = math.ceil(surface.get_height() * factor)
+        return self._get_scaled_surface(surface, w, h, fmt)
+
+    # premultiplied copies of the surfaces the SurfaceBackend blits, kept as long as those are (e.g. in the scaling
+    # cache), so they follow the zoom levels, frame budget and animation handling of the regular path
+    _premultiplied: weakref.WeakKeyDictionary[pygame.Surface, pygame.Surface] = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def _premultiplied_surface(cls, surface: pygame.Surface) -> pygame.Surface:
+        """
+        Premultiplied copy of a (scaled and converted) per pixel alpha surface, for BLEND_PREMULTIPLIED blits.
+        Not RLE accelerated, blits with special flags would have to decode it every time.
+        """
+        premultiplied = cls._premultiplied.get(surface)
+        if premultiplied is None:
+            premultiplied = surface.premul_alpha()
+            premultiplied.set_alpha(255)
+            cls._premultiplied[surface] = premultiplied
+            cls._cached_surfaces.add(premultiplied)
+        return premultiplied
+
+    @staticmethod
+    def _can_premultiply(surface: pygame.Surface) -> bool:
+        """Only per pixel alpha, BLEND_PREMULTIPLIED ignores colorkey and surface alpha."""
+        return (
+            bool(surface.get_flags() & pygame.SRCALPHA)
+            and surface.get_colorkey() is None
+            and surface.get_alpha() in (None, 255)
+        )
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _get_rotated_surface(
+        surface: pygame.Surface,
+        width: int,
+        height: int,
+        fmt: _SurfaceFormat,
+        angle: float,
+    ) -> pygame.Surface:
+        """Scaled and rotated (counter-clockwise) surface. The angle should already be quantized."""
+        scaled = Visor._get_scaled_surface(surface, width, height, fmt)
+        if not scaled.get_flags() & pygame.SRCALPHA:
+            # otherwise the padded corners are filled with the topleft color
+            scaled = scaled.convert(Visor._format_prototype(fmt, True))
+        rotated = pygame.transform.rotate(scaled, angle)
+        Visor._cached_surfaces.add(rotated)
+        return rotated
+
+    def _quantize_angle(self, angle: float) -> float:
+        return (round(angle / self.rotation_step) * self.rotation_step) % 360
 
     @classmethod
     def update_scaling_cache(cls, maxsize: int) -> None:
@@ -227,37 +750,384 @@ class Visor:
             original_method = cls._get_scaled_surface
 
         cls.clear_scaling_cache()
-        cls._get_scaled_surface = functools.lru_cache(maxsize=maxsize)(original_method)  # type: ignore[method-assign]
+        cls._recent_scaled_maxsize = max(64, maxsize)
+        cls._get_scaled_surface = staticmethod(  # type: ignore[method-assign, assignment]
+            functools.lru_cache(maxsize=maxsize)(original_method)
+        )
 
     @classmethod
     def get_scaling_cache_info(cls) -> functools._CacheInfo:
         return cls._get_scaled_surface.cache_info()
 
+    @classmethod
+    def get_scaling_cache_stats(cls) -> ScalingCacheStats:
+        """
+        Same as get_scaling_cache_info(), but additionally reports how many cache misses had a source surface
+        in a different pixel format than the destination. If that number keeps growing, call
+        convert()/convert_alpha() on your surfaces once after loading them.
+        """
+        info = cls.get_scaling_cache_info()
+        return ScalingCacheStats(info.hits, info.misses, info.maxsize, info.currsize, cls._unconverted_sources)
+
+    @classmethod
+    def get_scaling_cache_bytes(cls) -> int:
+        """Approximate memory used by the scaled and rotated surfaces that are currently cached."""
+        return sum(surf.get_width() * surf.get_height() * surf.get_bytesize() for surf in cls._cached_surfaces)
+
     @classmethod
     def clear_scaling_cache(cls) -> None:
+        cls._unconverted_sources = 0
+        cls._warned_unconverted = False
+        cls._recent_scaled.clear()
+        cls._get_converted_surface.cache_clear()
+        cls._scaled_index.clear()
+        cls._get_rotated_surface.cache_clear()
+        cls._get_scaled_frames.cache_clear()
+        cls._premultiplied.clear()
         if hasattr(cls._get_scaled_surface, 'cache_clear'):
             cls._get_scaled_surface.cache_clear()
 
-    def render(self, surface: pygame.Surface, surface_iterable: SurfaceIterable) -> None:
-        screen_rect = surface.get_rect()
-        assert screen_rect.size == self.screen, (
-            'Screen rect sizes differ. Make sure to use update_screen(rect) '
-            'before calling this method, if your screen size changed.'
+    @classmethod
+    def _remember_scaled(cls, source: pygame.Surface, scaled: pygame.Surface) -> None:
+        recent = cls._recent_scaled
+        recent[source] = scaled.get_size(), scaled
+        recent.move_to_end(source)
+        while len(recent) > cls._recent_scaled_maxsize:
+            recent.popitem(last=False)
+
+    def render(
+        self,
+        surface: RenderTarget,
+        surface_iterable: SurfaceIterable,
+        *,
+        world_scale: float = 1.0,
+        budget_ms: float | None = None,
+        occlusion: bool = False,
+        premultiplied: bool = False,
+    ) -> int:
+        """
+        Render all surfaces at their world position, scaled to the screen.
+        Items are ((world_x, world_y), surface) or ((world_x, world_y), surface, angle) tuples. The angle
+        rotates the surface counter-clockwise (in degrees) around its center, rotated surfaces are cached
+        for angles quantized to rotation_step. With a chunk_size, positions can also be (chunk, local) pairs.
+
+        What surface is depends on the backend: a pygame.Surface for the default SurfaceBackend, a target
+        Texture (or None for the window) for the TextureBackend.
+
+        world_scale is the number of world units a single pixel of the passed surfaces covers. Usually
+        surfaces are pre-rendered at world-scale (1.0), pre-reduced images (see LodProvider) use larger values.
+
+        budget_ms limits the time spent on scaling cache misses. Once the budget is used up, remaining misses
+        are drawn by stretching a recently scaled version of the same surface (e.g. from the previous zoom
+        level), or skipped if there is none. Returns the number of items that were stretched or skipped,
+        render again next frame until that is 0.
+
+        With occlusion=True, items completely hidden behind opaque items drawn later in the same call are skipped
+        before they're scaled (and counted in stats.culled). Surfaces without per pixel alpha, colorkey and
+        surface alpha are opaque, mark others with set_opaque(). Coverage is tracked in screen tiles of
+        occlusion_tile_size pixels, worth it for scenes with large overlapping opaque items.
+
+        premultiplied=True draws per pixel alpha surfaces premultiplied, with BLEND_PREMULTIPLIED (SurfaceBackend
+        only, rotated items and surfaces with a colorkey or surface alpha use the regular path). They are scaled like
+        always (including budget_ms), the scaled surfaces are premultiplied once and kept along with them.
+        Whether it's faster depends on the platform and the sprites, measure with examples/benchmark_premultiplied.py.
+        """
+        if self.chunk_size is not None:
+            surface_iterable = self._localize_items(surface_iterable)
+        if occlusion:
+            surface_iterable = self._cull_occluded(surface_iterable, world_scale)
+        if self.pick_index is not None:
+            surface_iterable = self.pick_index.record(self, surface_iterable, world_scale)
+        return self.backend.render(
+            self, surface, surface_iterable, world_scale=world_scale, budget_ms=budget_ms, premultiplied=premultiplied,
         )
-        factor = self.get_scaling_factor()
-        draw_area = self.get_active_screen_area()
-        if self.mode == VisorMode.RegionLetterbox:
-            subsurface = surface.subsurface(draw_area)
+
+    # surfaces with per pixel alpha, that are known to be fully opaque anyway
+    _opaque_surfaces: weakref.WeakSet[pygame.Surface] = weakref.WeakSet()
+
+    @classmethod
+    def set_opaque(cls, surface: pygame.Surface, opaque: bool = True) -> None:
+        """Flag a surface as opaque (or not) for occlusion culling, e.g. a fully opaque convert_alpha() image."""
+        if opaque:
+            cls._opaque_surfaces.add(surface)
         else:
-            subsurface = surface
-
-        for world_xy, surf in surface_iterable:
-            if not math.isclose(factor, 1.0):
-                w = math.ceil(surf.get_width() * factor)
-                h = math.ceil(surf.get_height() * factor)
-                surf = self._get_scaled_surface(surf, w, h)
-            sx, sy = self.world_to_screen(world_xy)
-            if self.mode == VisorMode.RegionLetterbox:
-                sx -= draw_area.x
-                sy -= draw_area.y
-            subsurface.blit(surf, (sx, sy))
+            cls._opaque_surfaces.discard(surface)
+
+    @classmethod
+    def is_opaque(cls, surface: pygame.Surface) -> bool:
+        if surface in cls._opaque_surfaces:
+            return True
+        return (
+            not surface.get_flags() & pygame.SRCALPHA
+            and surface.get_colorkey() is None
+            and surface.get_alpha() is None
+        )
+
+    def _cull_occluded(self, surface_iterable: SurfaceIterable, world_scale: float = 1.0) -> list[SurfaceItem]:
+        """The items not hidden behind opaque items drawn after them, see render(occlusion=True)."""
+        items = list(surface_iterable)
+        factor = self.get_scaling_factor() * world_scale
+        area = self.get_render_area()
+        coverage = OcclusionMap(area.size, self.occlusion_tile_size)
+        visible = []
+        # front to back
+        for item in reversed(items):
+            world_xy, surf = item[0], item[1]
+            w = math.ceil(surf.get_width() * factor)
+            h = math.ceil(surf.get_height() * factor)
+            if self.rotation or len(item) > 2:
+                item_angle = item[2] if len(item) > 2 else 0.0  # type: ignore[misc]
+                angle = self._quantize_angle(item_angle - self.rotation)
+                rect = self._rotated_item_rect(world_xy, surf, w, h, angle, world_scale)
+                # rotated corners are transparent, only unrotated items occlude
+                occluder = False
+            else:
+                rect = pygame.Rect(self.world_to_screen(world_xy), (w, h))
+                occluder = self.is_opaque(surf)
+            rect.move_ip(-area.x, -area.y)
+            if coverage.is_covered(rect):
+                continue
+            visible.append(item)
+            if occluder:
+                coverage.cover(rect)
+
+        self.stats.culled += len(items) - len(visible)
+        visible.reverse()
+        return visible
+
+    def _localize_items(self, surface_iterable: SurfaceIterable) -> Iterator[SurfaceItem]:
+        """Items with (chunk, local) positions converted to positions relative to the origin."""
+        to_local = self.to_local
+        for item in surface_iterable:
+            if is_chunk_pos(item[0]):
+                yield (to_local(item[0]),) + item[1:]  # type: ignore[misc]
+            else:
+                yield item
+
+    def enable_picking(self, cell_size: int = 64) -> PickIndex:
+        """
+        Record where render() draws each item, so pick() and pick_rect() can find them. Call
+        pick_index.clear() at the start of every frame, before rendering.
+        """
+        if self.pick_index is None or self.pick_index.cell_size != cell_size:
+            self.pick_index = PickIndex(cell_size)
+        return self.pick_index
+
+    def disable_picking(self) -> None:
+        self.pick_index = None
+
+    def _get_pick_index(self) -> PickIndex:
+        if self.pick_index is None:
+            raise RuntimeError('Picking is not enabled, call enable_picking() before rendering.')
+        return self.pick_index
+
+    def pick(self, screen_pos: ScreenPos, *, pixel: bool = False) -> list[PickHit]:
+        """
+        Items rendered (since the last pick_index.clear()) at the screen position, in draw order, so the
+        topmost one is last. With pixel=True transparent pixels are ignored, using masks cached per surface
+        and zoom level.
+        """
+        return self._get_pick_index().pick(screen_pos, pixel=pixel)
+
+    def pick_rect(self, screen_rect: ScreenRect, *, pixel: bool = False) -> list[PickHit]:
+        """Same as pick(), for all items overlapping a screen rect (e.g. a selection box)."""
+        return self._get_pick_index().pick_rect(screen_rect, pixel=pixel)
+
+    def _get_budgeted_surface(
+        self,
+        surface: pygame.Surface,
+        width: int,
+        height: int,
+        fmt: _SurfaceFormat,
+        start: float,
+        budget_ms: float,
+    ) -> pygame.Surface:
+        """
+        Scaled surface if it's cached or the budget allows scaling it. Otherwise the most recently scaled
+        version (of a different size), or the source surface itself if there is none.
+        """
+        cached = self._scaled_index.get((surface, width, height, fmt))
+        if cached is not None:
+            self._remember_scaled(surface, cached)
+            return cached
+        recent = self._recent_scaled.get(surface)
+        if (time.perf_counter() - start) * 1000 < budget_ms:
+            scaled = self._get_scaled_surface(surface, width, height, fmt)
+            self._remember_scaled(surface, scaled)
+            return scaled
+        if recent is not None:
+            return recent[1]
+        return surface
+
+    @classmethod
+    def update_text_cache(cls, maxsize: int) -> None:
+        """
+        Rendered strings are kept in an LRU cache (default 512 entries). Increase it, if you draw more
+        distinct labels per frame than that.
+        """
+        original_method = getattr(cls._render_text, '__wrapped__', cls._render_text)
+        cls._render_text = staticmethod(  # type: ignore[method-assign, assignment]
+            functools.lru_cache(maxsize=maxsize)(original_method)
+        )
+
+    @classmethod
+    def get_text_cache_info(cls) -> functools._CacheInfo:
+        return cls._render_text.cache_info()
+
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _get_font(font: str | None, size: int) -> pygame.font.Font:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        return pygame.font.Font(font, size)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _render_text(
+        font: str | None,
+        size: int,
+        text: str,
+        color: tuple[int, int, int, int],
+        antialias: bool,
+    ) -> pygame.Surface:
+        return Visor._get_font(font, size).render(text, antialias, color)
+
+    def _text_size(self, size: int, scale_with_zoom: bool) -> int:
+        if not scale_with_zoom:
+            return size
+        # bucket the sizes, so zooming doesn't create a new cache entry for every frame
+        step = self.text_size_step
+        return max(step, round(size * self.get_scaling_factor() / step) * step)
+
+    def draw_text(
+        self,
+        surface: pygame.Surface,
+        text: str,
+        pos: WorldPos,
+        color: ColorLike,
+        *,
+        font: str | None = None,
+        size: int = 16,
+        scale_with_zoom: bool = False,
+        anchor: str = 'topleft',
+        antialias: bool = True,
+    ) -> pygame.Rect:
+        """
+        Draw text anchored at a world position, rendered at screen resolution (so it's never blurry).
+        size is in screen pixels, or in world units if scale_with_zoom is True. font is a font file,
+        or None for the default font. anchor is any pygame.Rect position attribute (center, midbottom, ...).
+        """
+        return self.draw_texts(
+            surface, [(text, pos)], color,
+            font=font, size=size, scale_with_zoom=scale_with_zoom, anchor=anchor, antialias=antialias,
+        )
+
+    def draw_texts(
+        self,
+        surface: pygame.Surface,
+        labels: Iterable[tuple[str, WorldPos]],
+        color: ColorLike,
+        *,
+        font: str | None = None,
+        size: int = 16,
+        scale_with_zoom: bool = False,
+        anchor: str = 'topleft',
+        antialias: bool = True,
+    ) -> pygame.Rect:
+        """
+        Same as draw_text, for many (text, world_pos) labels at once. Rendered strings are cached
+        per font, size and color, so unchanged labels don't need Font.render() every frame.
+        """
+        labels = list(labels)
+        text_size = self._text_size(size, scale_with_zoom)
+        rgba = tuple(pygame.Color(color))
+        positions = self._transform_points(pos for _, pos in labels)
+
+        blits = []
+        for (text, _), screen_pos in zip(labels, positions):
+            text_surface = self._render_text(font, text_size, text, rgba, antialias)  # type: ignore[arg-type]
+            rect = text_surface.get_rect(**{anchor: screen_pos})
+            blits.append((text_surface, rect))
+
+        def draw() -> pygame.Rect:
+            surface.fblits([(text_surface, rect.topleft) for text_surface, rect in blits])
+            if not blits:
+                return pygame.Rect(0, 0, 0, 0)
+            return blits[0][1].unionall([rect for _, rect in blits[1:]]).clip(surface.get_clip())
+
+        return self._draw_clipped(surface, draw)
+
+    # Drawing primitives in world coordinates. They are drawn at screen resolution with pygame.draw,
+    # clipped to the render area. Widths are in screen pixels, radii in world units.
+
+    def _draw_clipped(self, surface: pygame.Surface, draw: Callable[[], pygame.Rect]) -> pygame.Rect:
+        old_clip = surface.get_clip()
+        surface.set_clip(old_clip.clip(self.get_render_area()))
+        try:
+            return draw()
+        finally:
+            surface.set_clip(old_clip)
+
+    def draw_line(
+        self,
+        surface: pygame.Surface,
+        color: ColorLike,
+        start: WorldPos,
+        end: WorldPos,
+        width: int = 1,
+    ) -> pygame.Rect:
+        a, b = self._transform_points((start, end))
+        return self._draw_clipped(surface, lambda: pygame.draw.line(surface, color, a, b, width))
+
+    def draw_lines(
+        self,
+        surface: pygame.Surface,
+        color: ColorLike,
+        closed: bool,
+        points: Iterable[WorldPos],
+        width: int = 1,
+    ) -> pygame.Rect:
+        screen_points = self._transform_points(points)
+        return self._draw_clipped(surface, lambda: pygame.draw.lines(surface, color, closed, screen_points, width))
+
+    def draw_polygon(
+        self,
+        surface: pygame.Surface,
+        color: ColorLike,
+        points: Iterable[WorldPos],
+        width: int = 0,
+    ) -> pygame.Rect:
+        screen_points = self._transform_points(points)
+        return self._draw_clipped(surface, lambda: pygame.draw.polygon(surface, color, screen_points, width))
+
+    def draw_rect(
+        self,
+        surface: pygame.Surface,
+        color: ColorLike,
+        rect: WorldRect,
+        width: int = 0,
+    ) -> pygame.Rect:
+        world_rect = FRect(rect) if is_world_rect(rect) else FRect((0, 0), rect)
+        corners = (world_rect.topleft, world_rect.topright, world_rect.bottomright, world_rect.bottomleft)
+        if self.rotation:
+            return self.draw_polygon(surface, color, corners, width)
+
+        (left, top), _, (right, bottom), _ = self._transform_points(corners)
+        # round the edges instead of the size, so adjacent rects don't overlap or leave gaps
+        screen_rect = pygame.Rect(round(left), round(top), round(right) - round(left), round(bottom) - round(top))
+        return self._draw_clipped(surface, lambda: pygame.draw.rect(surface, color, screen_rect, width))
+
+    def draw_circle(
+        self,
+        surface: pygame.Surface,
+        color: ColorLike,
+        center: WorldPos,
+        radius: float,
+        width: int = 0,
+    ) -> pygame.Rect:
+        (screen_center,) = self._transform_points((center,))
+        screen_radius = radius * self.get_scaling_factor()
+        return self._draw_clipped(
+            surface,
+            lambda: pygame.draw.circle(surface, color, screen_center, screen_radius, width),
+        )
@@ -0,0 +1,12 @@
+import os
+
+import pytest
+
+
+@pytest.fixture(scope='session')
+def headless_video():
+    """SDL's dummy video driver for tests that need a window, unless another driver was chosen explicitly."""
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        if 'SDL_VIDEODRIVER' not in os.environ:
+            monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+        yield
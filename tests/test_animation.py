@@ -0,0 +1,101 @@
+import pygame
+import pytest
+
+from pygame_visor import Animation, Visor, VisorMode, VisorGroup
+
+
+def make_sheet():
+    sheet = pygame.Surface((40, 20), pygame.SRCALPHA)
+    for n, color in enumerate(['red', 'green', 'blue', 'white']):
+        sheet.fill(color, ((n % 2) * 20, (n // 2) * 10, 20, 10))
+    sheet.fill((255, 0, 0, 128), (0, 0, 2, 2))
+    return sheet
+
+
+def test_frames_and_timing():
+    animation = Animation.from_grid(make_sheet(), (20, 10), frame_ms=[100, 50, 50, 100])
+    assert len(animation) == 4
+    assert animation.duration == 300
+    assert animation.frames[0].get_at((0, 0)) == pygame.Color(255, 0, 0, 128)
+    assert animation.frames[3].get_at((5, 5)) == pygame.Color('white')
+    assert [animation.frame_index(t) for t in (0, 99, 100, 160, 299, 300)] == [0, 0, 1, 2, 3, 0]
+
+    once = Animation.from_grid(make_sheet(), (20, 10), count=2, loop=False)
+    assert len(once) == 2
+    assert once.frame_index(1000) == 1
+    assert once.item((1, 2), 150) == ((1, 2), once.frames[1])
+
+    with pytest.raises(ValueError):
+        Animation(make_sheet(), [])
+    with pytest.raises(ValueError):
+        Animation(make_sheet(), [(0, 0, 20, 10)], [100, 100])
+
+
+@pytest.mark.parametrize('flags', [0, pygame.SRCALPHA])
+def test_frames_keep_surface_alpha_and_colorkey(flags):
+    sheet = pygame.Surface((20, 10), flags)
+    sheet.fill((10, 20, 30, 128))
+    sheet.fill((255, 0, 255), (10, 0, 10, 10))
+    sheet.set_colorkey((255, 0, 255))
+    sheet.set_alpha(100)
+    animation = Animation.from_grid(sheet, (10, 10))
+
+    for frame in animation.frames:
+        assert frame.get_masks() == sheet.get_masks()
+        assert frame.get_alpha() == 100
+        assert frame.get_colorkey() == sheet.get_colorkey()
+        # blitted just like the area of the sheet
+        expected = pygame.Surface((10, 10))
+        expected.fill('white')
+        expected.blit(sheet, (0, 0), (frame.index * 10, 0, 10, 10))
+        drawn = pygame.Surface((10, 10))
+        drawn.fill('white')
+        drawn.blit(frame, (0, 0))
+        assert drawn.get_at((5, 5)) == expected.get_at((5, 5))
+    assert animation.frames[1].get_at((5, 5))[:3] == (255, 0, 255)
+    copy = animation.frames[0].copy()
+    assert type(copy) is pygame.Surface
+    assert copy.get_alpha() == 100
+    assert copy.get_at((0, 0)) == animation.frames[0].get_at((0, 0))
+
+
+def test_frames_are_scaled_together():
+    Visor.clear_scaling_cache()
+    animation = Animation.from_grid(make_sheet(), (20, 10))
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+
+    for t in range(0, 800, 100):
+        view.render(target, [animation.item((0, 0), t), animation.item((50, 50), t + 100)])
+    info = Visor._get_scaled_frames.cache_info()
+    assert (info.misses, info.hits) == (1, 15)
+    # the per surface cache is left alone
+    assert Visor.get_scaling_cache_info().currsize == 0
+    assert target.get_at((10, 10)) == pygame.Color('white')
+    assert target.get_at((110, 110)) == pygame.Color('red')
+
+    # same pixels as rendering a plain copy of the frame
+    target.fill('black')
+    view.render(target, [animation.item((0, 0), 300), animation.item((50, 50), 0)])
+    expected = pygame.Surface((200, 200))
+    view.render(expected, [((0, 0), animation.frames[3].copy()), ((50, 50), animation.frames[0].copy())])
+    assert pygame.image.tobytes(expected, 'RGB') == pygame.image.tobytes(target, 'RGB')
+
+    view.region.scale_by_ip(0.5, 0.5)
+    view.render(target, [animation.item((0, 0), 0)])
+    assert Visor._get_scaled_frames.cache_info().misses == 2
+
+
+def test_sprite_group_uses_frame_cache():
+    Visor.clear_scaling_cache()
+    animation = Animation.from_grid(make_sheet(), (20, 10))
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    sprite = pygame.sprite.Sprite()
+    sprite.rect = pygame.Rect(0, 0, 20, 10)
+    group = VisorGroup(sprite)
+
+    for t in range(0, 400, 100):
+        sprite.image = animation.frame(t)
+        group.draw(target, view)
+    assert Visor._get_scaled_frames.cache_info().misses == 1
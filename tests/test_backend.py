@@ -0,0 +1,90 @@
+import pygame
+import pytest
+from pygame._sdl2.video import Window, Renderer, Texture
+
+from pygame_visor import Visor, VisorMode, RenderBackend, TextureBackend
+
+
+def test_render_backend_is_abstract():
+    with pytest.raises(TypeError):
+        RenderBackend()  # type: ignore[abstract]
+
+
+@pytest.fixture(scope='module')
+def renderer(headless_video):
+    pygame.display.init()
+    window = Window('pygame-visor tests', (64, 64), hidden=True)
+    # software renderer, works headless
+    yield Renderer(window, accelerated=0)
+    window.destroy()
+
+
+def make_tiles():
+    tiles = []
+    for n in range(9):
+        tile = pygame.Surface((10, 10))
+        tile.fill((n * 25, 255 - n * 25, 100))
+        tiles.append(((n % 3 * 10, n // 3 * 10), tile))
+    return tiles
+
+
+@pytest.mark.parametrize('mode', [VisorMode.RegionLetterbox, VisorMode.RegionExpand])
+@pytest.mark.parametrize('region', [(0, 0, 30, 30), (5, 5, 20, 20), (-10, 0, 60, 60)])
+def test_texture_backend_matches_surface_backend(renderer: Renderer, mode: VisorMode, region):
+    screen = (120, 90)
+    tiles = make_tiles()
+
+    expected = pygame.Surface(screen)
+    Visor(mode, screen, region=region).render(expected, tiles)
+
+    backend = TextureBackend(renderer)
+    target = Texture(renderer, screen, target=True)
+    renderer.target = target
+    renderer.draw_color = (0, 0, 0, 255)
+    renderer.clear()
+    renderer.target = None
+
+    view = Visor(mode, screen, region=region, backend=backend)
+    view.render(target, tiles)
+
+    renderer.target = target
+    result = renderer.to_surface()
+    renderer.target = None
+
+    for x in range(0, screen[0], 3):
+        for y in range(0, screen[1], 3):
+            assert result.get_at((x, y)) == expected.get_at((x, y)), (x, y)
+
+
+def test_texture_backend_caches_textures(renderer: Renderer):
+    backend = TextureBackend(renderer, cache_size=4)
+    target = Texture(renderer, (30, 30), target=True)
+    view = Visor(VisorMode.RegionLetterbox, (30, 30), region=(0, 0, 30, 30), backend=backend)
+    tiles = make_tiles()
+    view.render(target, tiles[:2])
+    view.render(target, tiles[:2])
+    info = backend._get_texture.cache_info()
+    assert (info.hits, info.misses) == (2, 2)
+
+
+def test_texture_backend_rotation(renderer: Renderer):
+    screen = (100, 100)
+    tile = pygame.Surface((10, 10))
+    tile.fill('red')
+
+    target = Texture(renderer, screen, target=True)
+    renderer.target = target
+    renderer.draw_color = (0, 0, 0, 255)
+    renderer.clear()
+    renderer.target = None
+
+    view = Visor(VisorMode.RegionLetterbox, screen, region=(0, 0, 100, 100), rotation=90,
+                 backend=TextureBackend(renderer))
+    view.render(target, [((70, 45), tile), ((15, 23), tile, 45)])
+
+    renderer.target = target
+    result = renderer.to_surface()
+    renderer.target = None
+
+    assert result.get_at((50, 75)) == pygame.Color('red')
+    assert result.get_at((75, 50)) == pygame.Color('black')
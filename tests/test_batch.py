@@ -0,0 +1,68 @@
+import functools
+import gc
+
+import pygame
+
+from pygame_visor import Visor, VisorMode, VisorState, render_batch
+from pygame_visor.batch import _SegmentPool, _SharedBuffer
+
+
+def make_scene(color: str):
+    tile = pygame.Surface((10, 10))
+    tile.fill(color)
+
+    def provider(bbox: pygame.FRect):
+        return [((x, 0), tile) for x in range(0, 100, 20)]
+
+    return provider
+
+
+def test_visor_state_roundtrip():
+    view = Visor(VisorMode.RegionExpand, (200, 100), region=(10, 20, 30, 40), limits=(0, 0, 100, 100))
+    state = VisorState.from_visor(view)
+    assert state == (VisorMode.RegionExpand, (200, 100), (10, 20, 30, 40), (0, 0, 100, 100), 0.0, None, (0, 0))
+
+    copy = state.to_visor()
+    assert copy.mode == view.mode
+    assert copy.screen == view.screen
+    assert tuple(copy.region) == tuple(view.region)
+
+
+def test_render_batch():
+    states = [
+        VisorState(VisorMode.RegionLetterbox, (100, 10), (x, 0, 100, 10))
+        for x in range(0, 40, 10)
+    ]
+    results = list(render_batch(functools.partial(make_scene, 'red'), states, max_workers=2))
+
+    assert len(results) == len(states)
+    for state, surface in zip(states, results):
+        x = state.region[0]
+        assert surface.get_size() == (100, 10)
+        # tiles start every 20 units
+        expected = 'red' if x % 20 == 0 else 'black'
+        assert surface.get_at((5, 5)) == pygame.Color(expected)
+
+    # compare with an in process render
+    expected_surface = pygame.Surface((100, 10))
+    view = states[1].to_visor()
+    view.render(expected_surface, make_scene('red')(view.get_bounding_box()))
+    for x in range(100):
+        assert results[1].get_at((x, 5)) == expected_surface.get_at((x, 5))
+
+
+def test_segments_are_reused_after_the_surface_is_gone():
+    pool = _SegmentPool()
+    shm = pool.acquire(400)
+    surface = pygame.image.frombuffer(_SharedBuffer(pool, shm, 400), (10, 10), 'RGBX')
+    surface.fill('red')
+    assert bytes(shm.buf[:3]) == b'\xff\x00\x00'
+    other = pool.acquire(400)
+    assert other is not shm
+
+    del surface
+    gc.collect()
+    assert pool.acquire(100) is shm
+    pool.release(shm)
+    pool.release(other)
+    pool.close()
@@ -0,0 +1,113 @@
+import pygame
+import pytest
+
+from pygame_visor import Visor, VisorMode, Compositor
+
+
+def make_provider(calls: list):
+    tile = pygame.Surface((10, 10))
+    tile.fill('red')
+
+    def provider(bbox: pygame.FRect):
+        calls.append(tuple(bbox))
+        return [((0, 0), tile), ((490, 490), tile)]
+
+    return provider
+
+
+def test_layout_and_resize():
+    compositor = Compositor((800, 600))
+    top = compositor.add_view('top', Visor(VisorMode.RegionExpand, (1, 1), region=(0, 0, 100, 100)), (0, 0, 1, 0.5))
+    bottom = compositor.add_view('bottom', Visor(VisorMode.RegionExpand, (1, 1), region=(0, 0, 100, 100)),
+                                 (0, 0.5, 1, 0.5))
+
+    assert tuple(top.rect) == (0, 0, 800, 300)
+    assert tuple(bottom.rect) == (0, 300, 800, 300)
+    assert top.visor.screen == (800, 300)
+
+    compositor.resize((1001, 501))
+    assert tuple(top.rect) == (0, 0, 1001, 250)
+    assert tuple(bottom.rect) == (0, 250, 1001, 251)
+    assert bottom.visor.screen == (1001, 251)
+
+    with pytest.raises(ValueError):
+        compositor.add_view('top', Visor(VisorMode.RegionExpand, (1, 1), region=(0, 0, 100, 100)))
+
+
+def test_render_into_subsurfaces():
+    calls = []
+    screen = pygame.Surface((200, 100))
+    compositor = Compositor(screen.get_size())
+    compositor.add_view('left', Visor(VisorMode.RegionExpand, (1, 1), region=(0, 0, 100, 100)), (0, 0, 0.5, 1))
+    compositor.add_view('right', Visor(VisorMode.RegionExpand, (1, 1), region=(400, 400, 100, 100)), (0.5, 0, 0.5, 1))
+
+    compositor.render(screen, make_provider(calls))
+    # far apart, so they are queried separately
+    assert len(calls) == 2
+    assert screen.get_at((5, 5)) == pygame.Color('red')
+    assert screen.get_at((105, 5)) == pygame.Color('black')
+    assert screen.get_at((195, 95)) == pygame.Color('red')
+
+    names = [viewport.name for viewport, subsurface in compositor.views(screen)]
+    assert names == ['left', 'right']
+
+
+def test_overlapping_views_share_the_query():
+    calls = []
+    screen = pygame.Surface((200, 100))
+    compositor = Compositor(screen.get_size())
+    compositor.add_view('left', Visor(VisorMode.RegionExpand, (1, 1), region=(0, 0, 100, 100)), (0, 0, 0.5, 1))
+    compositor.add_view('right', Visor(VisorMode.RegionExpand, (1, 1), region=(5, 0, 100, 100)), (0.5, 0, 0.5, 1))
+
+    compositor.render(screen, make_provider(calls))
+    assert calls == [(0, 0, 105, 100)]
+    assert screen.get_at((5, 5)) == pygame.Color('red')
+    assert screen.get_at((100, 5)) == pygame.Color('red')
+    assert screen.get_at((106, 5)) == pygame.Color('black')
+
+
+def test_background_is_filled_per_view():
+    screen = pygame.Surface((200, 100))
+    screen.fill('white')
+    compositor = Compositor(screen.get_size())
+    compositor.add_view('left', Visor(VisorMode.RegionExpand, (1, 1), region=(0, 0, 100, 100)), (0, 0, 0.5, 1),
+                        background='blue')
+    compositor.add_view('right', Visor(VisorMode.RegionExpand, (1, 1), region=(400, 400, 100, 100)), (0.5, 0, 0.5, 1))
+
+    compositor.render(screen, make_provider([]))
+    assert screen.get_at((5, 5)) == pygame.Color('red')
+    assert screen.get_at((50, 50)) == pygame.Color('blue')
+    assert screen.get_at((150, 50)) == pygame.Color('white')
+
+
+def test_chunk_positions():
+    calls = []
+    tile = pygame.Surface((10, 10))
+    tile.fill('red')
+
+    def provider(bbox: pygame.FRect):
+        calls.append(tuple(bbox))
+        return [(((5, 5), (0, 0)), tile), (((0, 0), (0, 0)), tile)]
+
+    screen = pygame.Surface((200, 100))
+    compositor = Compositor(screen.get_size())
+    left = Visor(VisorMode.RegionExpand, (1, 1), region=(0, 0, 100, 100), chunk_size=1000)
+    right = Visor(VisorMode.RegionExpand, (1, 1), region=(0, 0, 100, 100), chunk_size=1000)
+    left.move_to(((5, 5), (50, 50)))
+    right.move_to(((5, 5), (55, 50)))
+    assert left.origin == right.origin == (5, 5)
+    compositor.add_view('left', left, (0, 0, 0.5, 1))
+    compositor.add_view('right', right, (0.5, 0, 0.5, 1))
+
+    compositor.render(screen, provider)
+    assert calls == [(0, 0, 105, 100)]
+    assert screen.get_at((5, 5)) == pygame.Color('red')
+    assert screen.get_at((100, 5)) == pygame.Color('red')
+    assert left.stats.culled == right.stats.culled == 1
+
+    # different origins don't share a query
+    calls.clear()
+    right.move_to(((0, 0), (50, 50)))
+    compositor.render(screen, provider)
+    assert len(calls) == 2
+    assert screen.get_at((105, 5)) == pygame.Color('red')
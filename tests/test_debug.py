@@ -0,0 +1,70 @@
+import pygame
+
+from pygame_visor import Visor, VisorMode, VisorDebugOverlay
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_overlay():
+    target = pygame.Surface((400, 400))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100), limits=(-50, -50, 150, 150))
+    timer = FakeTimer()
+    overlay = VisorDebugOverlay(view, history=50, graph_height=20, graph_ms=20, timer=timer)
+    return target, view, overlay, timer
+
+
+def test_stats_are_counted_and_reset():
+    target, view, overlay, _ = make_overlay()
+    tile = pygame.Surface((10, 10))
+    view.render(target, [((0, 0), tile), ((20, 0), tile)])
+    assert (view.stats.items, view.stats.blits) == (2, 2)
+
+    overlay.draw(target, (200, 200))
+    assert (view.stats.items, view.stats.blits, view.stats.culled) == (0, 0, 0)
+    # outline of the active area
+    assert target.get_at((399, 399)) == pygame.Color('magenta')
+
+
+def test_frame_graph_scrolls():
+    target, view, overlay, timer = make_overlay()
+    overlay.draw(target)
+    timer.now += 0.010
+    overlay.draw(target)
+    assert overlay.frame_ms == 10
+    timer.now += 0.040
+    overlay.draw(target)
+    assert overlay.frame_ms == 40
+
+    graph = overlay._graph
+    # 10ms is half the graph height, 40ms is clamped and marked as over budget
+    assert graph.get_at((48, 19)) == pygame.Color('yellow')
+    assert graph.get_at((48, 5)) == pygame.Color('black')
+    assert graph.get_at((49, 0)) == pygame.Color('red')
+
+
+def test_text_is_updated_at_interval():
+    target, view, overlay, timer = make_overlay()
+    overlay.draw(target)
+    text = overlay._text
+    timer.now += 0.1
+    overlay.draw(target)
+    assert overlay._text is text
+    timer.now += 0.2
+    overlay.draw(target)
+    assert overlay._text is not text
+
+
+def test_scaling_cache_bytes():
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    view.render(target, [((0, 0), pygame.Surface((10, 10)))])
+    assert Visor.get_scaling_cache_bytes() == 20 * 20 * target.get_bytesize()
+    Visor.clear_scaling_cache()
+    assert Visor.get_scaling_cache_bytes() == 0
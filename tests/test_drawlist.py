@@ -0,0 +1,87 @@
+import random
+
+import pygame
+import pytest
+
+from pygame_visor import DrawList, Visor, VisorMode
+
+
+def make_surface(height: int = 10) -> pygame.Surface:
+    return pygame.Surface((10, height))
+
+
+def test_y_sorted_by_bottom_edge():
+    draw_list = DrawList()
+    tall = draw_list.add((0, 0), make_surface(50))
+    small = draw_list.add((0, 20), make_surface(10))
+    top = draw_list.add((0, -10), make_surface(10))
+
+    assert list(draw_list.items()) == [top, small, tall]
+
+    small.pos = (0, 100)
+    assert list(draw_list.items()) == [top, tall, small]
+
+
+def test_layers_and_sort_keys():
+    draw_list = DrawList()
+    ui = draw_list.add((0, 0), make_surface(), layer=10)
+    ground = draw_list.add((0, 500), make_surface(), layer=-1)
+    a = draw_list.add((0, 0), make_surface(), sort_key=5)
+    b = draw_list.add((0, 0), make_surface(), sort_key=1)
+
+    assert list(draw_list.items()) == [ground, b, a, ui]
+
+    ui.layer = -5
+    assert list(draw_list.items()) == [ui, ground, b, a]
+    assert len(draw_list) == 4
+
+    draw_list.remove(a)
+    assert list(draw_list.items()) == [ui, ground, b]
+
+
+def test_stable_for_equal_depths():
+    draw_list = DrawList()
+    items = [draw_list.add((0, 0), make_surface()) for _ in range(10)]
+    assert list(draw_list.items()) == items
+
+
+def test_matches_full_sort_over_frames():
+    rng = random.Random(4)
+    draw_list = DrawList()
+    items = [draw_list.add((rng.uniform(0, 1000), rng.uniform(0, 1000)), make_surface(), layer=rng.randint(0, 2))
+             for _ in range(500)]
+
+    for _ in range(10):
+        for item in items:
+            x, y = item.pos
+            item.pos = (x, y + rng.uniform(-5, 5))
+        expected = sorted(items, key=lambda it: (it.layer, it.depth()))
+        assert [(it.layer, it.depth()) for it in draw_list.items()] == [(it.layer, it.depth()) for it in expected]
+
+
+def test_render_draw_list():
+    target = pygame.Surface((100, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    back = make_surface()
+    back.fill('blue')
+    front = make_surface()
+    front.fill('red')
+
+    draw_list = DrawList()
+    draw_list.add((0, 5), front)
+    draw_list.add((0, 0), back)
+    view.render(target, draw_list)
+    assert target.get_at((5, 7)) == pygame.Color('red')
+
+
+def test_chunk_positions_are_sorted_by_absolute_y():
+    draw_list = DrawList(chunk_size=100)
+    below = draw_list.add(((0, 1), (0, 5)), make_surface())
+    above = draw_list.add(((3, 0), (0, 90)), make_surface())
+    crossing = draw_list.add(((0, 0), (0, 95)), make_surface(20))
+    assert list(draw_list.items()) == [above, below, crossing]
+
+    without_chunks = DrawList()
+    without_chunks.add(((0, 0), (0, 0)), make_surface())
+    with pytest.raises(ValueError):
+        without_chunks.sort()
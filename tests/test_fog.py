@@ -0,0 +1,135 @@
+import array
+
+import pygame
+import pytest
+
+from pygame_visor import Visor, VisorMode, FogOfWar
+
+
+def make_view():
+    target = pygame.Surface((200, 200))
+    target.fill('white')
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    return target, view
+
+
+def test_cells():
+    fog = FogOfWar((10, 5), 10, origin=(-50, 0))
+    assert len(fog.data) == 50
+    assert fog.cell_at((-50, 0)) == (0, 0)
+    assert fog.cell_at((-1, 49)) == (4, 4)
+
+    fog[2, 3] = FogOfWar.VISIBLE
+    assert fog[2, 3] == 255
+    with pytest.raises(IndexError):
+        fog[10, 0] = 1
+
+    fog.reveal((-25, 25), 10)
+    assert fog[2, 2] == 255
+    assert fog[2, 1] == 255
+    assert fog[1, 1] == 0
+
+    fog.update_from(array.array('B', [FogOfWar.EXPLORED] * 50))
+    assert fog[0, 0] == 128
+    with pytest.raises(ValueError):
+        fog.update_from(b'\x00')
+    with pytest.raises(ValueError):
+        FogOfWar((0, 5), 10)
+
+
+def test_draw_masks_only_cells_in_view():
+    target, view = make_view()
+    fog = FogOfWar((100, 100), 10, origin=(-500, -500))
+    fog[50, 50] = FogOfWar.VISIBLE
+    fog[51, 50] = FogOfWar.EXPLORED
+
+    fog.draw(target, view)
+    window, mask = fog.get_mask(view)
+    assert window == pygame.Rect(50, 50, 11, 11)
+    assert mask.get_size() == (11, 11)
+
+    assert target.get_at((10, 10)) == pygame.Color('white')
+    assert target.get_at((30, 10)) == pygame.Color(128, 128, 128)
+    assert target.get_at((50, 10)) == pygame.Color('black')
+
+
+def test_draw_is_not_picked_or_counted():
+    target, view = make_view()
+    view.enable_picking()
+    unit = pygame.Surface((10, 10))
+    view.render(target, [((40, 40), unit)])
+    fog = FogOfWar((10, 10), 10)
+    view.stats.reset()
+
+    fog.draw(target, view)
+    assert [hit.item[1] for hit in view.pick((90, 90))] == [unit]
+    assert view.stats.items == view.stats.blits == 0
+    assert target.get_at((90, 90)) == pygame.Color('black')
+
+
+def test_scaled_masks_are_cached_by_the_fog():
+    Visor.clear_scaling_cache()
+    target, view = make_view()
+    fog = FogOfWar((10, 10), 10)
+    fog.draw(target, view)
+    fog.draw(target, view)
+    assert Visor.get_scaling_cache_info().currsize == 0
+    assert list(fog._scaled) == [(200, 200, 0.0)]
+
+    view.region.scale_by_ip(2, 2)
+    fog.draw(target, view)
+    assert len(fog._scaled) == 2
+
+    fog[0, 0] = FogOfWar.VISIBLE
+    fog.draw(target, view)
+    assert len(fog._scaled) == 1
+
+
+def test_draw_with_rotation():
+    target, view = make_view()
+    view.rotation = 90
+    fog = FogOfWar((10, 10), 10)
+    fog[0, 0] = FogOfWar.VISIBLE
+    fog.draw(target, view)
+    assert target.get_at(view.world_to_screen((5, 5))) == pygame.Color('white')
+    assert target.get_at(view.world_to_screen((15, 5))) == pygame.Color('black')
+
+
+def test_draw_with_floating_origin():
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100), chunk_size=100)
+    fog = FogOfWar((100, 10), 10)
+    fog[25, 0] = FogOfWar.VISIBLE
+
+    view.move_to((260, 50))
+    assert view.origin == (2, 0)
+    target.fill('white')
+    fog.draw(target, view)
+    assert fog.get_mask(view)[0].x == 21
+    # cell 25 covers world 250 - 260, the region starts at 210
+    assert target.get_at(view.world_to_screen((255 - 200, 5))) == pygame.Color('white')
+    assert target.get_at(view.world_to_screen((245 - 200, 5))) == pygame.Color('black')
+
+
+def test_mask_is_patched_incrementally():
+    target, view = make_view()
+    fog = FogOfWar((100, 100), 10, origin=(-500, -500))
+    _, mask = fog.get_mask(view)
+    assert fog.get_mask(view)[1] is mask
+
+    # changes outside the view don't touch the mask
+    fog[0, 0] = FogOfWar.VISIBLE
+    assert fog.get_mask(view)[1] is mask
+
+    fog[52, 52] = FogOfWar.VISIBLE
+    _, patched = fog.get_mask(view)
+    assert patched is not mask
+    assert patched.get_at((2, 2)).a == 0
+    assert patched.get_at((3, 3)).a == 255
+
+    fog.fill(FogOfWar.VISIBLE)
+    _, rebuilt = fog.get_mask(view)
+    assert rebuilt.get_at((0, 0)).a == 0
+
+    view.move_to((1000, 1000))
+    assert fog.get_mask(view)[1] is None
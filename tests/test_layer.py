@@ -0,0 +1,137 @@
+import pygame
+import pytest
+
+from pygame_visor import Visor, VisorMode, Layer, OverscanLayer
+
+
+def make_tile(color) -> pygame.Surface:
+    tile = pygame.Surface((10, 10))
+    tile.fill(color)
+    return tile
+
+
+def test_layer_renders_only_on_change():
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 100, 100))
+    calls = []
+
+    def provider(bbox: pygame.FRect):
+        calls.append(tuple(bbox))
+        return [((0, 0), make_tile('red'))]
+
+    layer = Layer(view, provider, background='black')
+    target = pygame.Surface((100, 100))
+
+    assert layer.draw(target)
+    assert not layer.draw(target)
+    assert len(calls) == 1
+    assert target.get_at((5, 5)) == pygame.Color('red')
+
+    view.move_to((60, 50))
+    assert layer.draw(target)
+    assert len(calls) == 2
+    assert calls[-1] == (10, 0, 100, 100)
+
+    layer.invalidate()
+    assert layer.draw(target)
+    assert len(calls) == 3
+
+
+def test_layer_set_items():
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 100, 100))
+    layer = Layer(view, [((0, 0), make_tile('red'))])
+    target = pygame.Surface((100, 100))
+
+    layer.draw(target)
+    assert target.get_at((5, 5)) == pygame.Color('red')
+
+    layer.set_items([((20, 0), make_tile('blue'))])
+    target.fill('black')
+    assert layer.draw(target)
+    # transparent layer, the old tile is gone
+    assert target.get_at((5, 5)) == pygame.Color('black')
+    assert target.get_at((25, 5)) == pygame.Color('blue')
+
+
+def test_dynamic_layer_always_renders():
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 100, 100))
+    layer = Layer(view, [((0, 0), make_tile('red'))], dynamic=True)
+    target = pygame.Surface((100, 100))
+    assert layer.draw(target)
+    assert layer.draw(target)
+
+
+def test_layer_follows_screen_size():
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 100, 100))
+    layer = Layer(view, [((0, 0), make_tile('red'))])
+    layer.update()
+
+    view.update_screen((200, 200))
+    assert layer.update()
+    assert layer.surface.get_size() == (200, 200)
+    assert layer.surface.get_at((15, 15)) == pygame.Color('red')
+
+
+def striped_provider(calls: list):
+    tiles = []
+    for n in range(4):
+        tile = pygame.Surface((10, 10))
+        tile.fill((n * 60, 255 - n * 60, 0))
+        tiles.append(tile)
+
+    def provider(bbox: pygame.FRect):
+        calls.append(tuple(bbox))
+        for y in range(-100, 200, 10):
+            for x in range(-100, 200, 10):
+                yield (x, y), tiles[(x // 10 + y // 10) % 4]
+
+    return provider
+
+
+@pytest.mark.parametrize('mode', [VisorMode.RegionLetterbox, VisorMode.RegionExpand])
+def test_overscan_layer_shifts_without_render(mode: VisorMode):
+    calls = []
+    provider = striped_provider(calls)
+    view = Visor(mode, (200, 100), region=(0, 0, 50, 50))
+    layer = OverscanLayer(view, provider, margin=20, background='black')
+    target = pygame.Surface((200, 100))
+
+    assert layer.draw(target)
+    assert layer.surface.get_size() == (240, 140)
+
+    # 5 world units are 10 pixels, within the margin
+    view.region.move_ip(5, -5)
+    target.fill('black')
+    assert not layer.draw(target)
+    assert len(calls) == 1
+
+    expected = pygame.Surface((200, 100))
+    view.render(expected, provider(view.get_bounding_box()))
+    area = view.get_active_screen_area() if mode == VisorMode.RegionLetterbox else target.get_rect()
+    for x in range(area.left, area.right, 7):
+        for y in range(area.top, area.bottom, 7):
+            assert target.get_at((x, y)) == expected.get_at((x, y))
+
+    # outside of the margin
+    view.region.move_ip(20, 0)
+    assert layer.draw(target)
+
+    # zooming always re-renders
+    view.region.scale_by_ip(0.5, 0.5)
+    assert layer.draw(target)
+
+
+@pytest.mark.parametrize('size', [100, 50])
+def test_overscan_layer_matches_direct_draws(size: int):
+    provider = striped_provider([])
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0.3, 0.6, size, size))
+    layer = OverscanLayer(view, provider, margin=20, background='black')
+    target = pygame.Surface((100, 100))
+    expected = pygame.Surface((100, 100))
+
+    for step in range(12):
+        view.region.move_ip(0.37, -0.29)
+        layer.draw(target)
+        expected.fill('black')
+        view.render(expected, provider(view.get_bounding_box()))
+        for x in range(0, 100, 3):
+            assert target.get_at((x, x)) == expected.get_at((x, x)), step
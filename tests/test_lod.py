@@ -0,0 +1,89 @@
+import pygame
+import pytest
+
+from pygame_visor import Visor, VisorMode, LodProvider
+
+
+def checker_provider(calls: list | None = None):
+    tile = pygame.Surface((16, 16))
+    tile.fill((200, 100, 50))
+
+    def provider(bbox: pygame.FRect):
+        if calls is not None:
+            calls.append(tuple(bbox))
+        for y in range(int(bbox.top) // 16 * 16, int(bbox.bottom), 16):
+            for x in range(int(bbox.left) // 16 * 16, int(bbox.right), 16):
+                if 0 <= x < 512 and 0 <= y < 512:
+                    yield (x, y), tile
+
+    return provider
+
+
+@pytest.mark.parametrize('region,expected_level', [
+    [(0, 0, 100, 100), 0],
+    [(0, 0, 200, 200), 1],
+    [(0, 0, 399, 399), 1],
+    [(0, 0, 400, 400), 2],
+    [(0, 0, 100_000, 100_000), 3],
+])
+def test_choose_level(region, expected_level):
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=region)
+    lod = LodProvider(checker_provider(), 64, max_level=3)
+    assert lod.choose_level(view) == expected_level
+
+
+def test_level_zero_is_passed_through():
+    calls = []
+    lod = LodProvider(checker_provider(calls), 64)
+    items = list(lod.get_items(pygame.FRect(0, 0, 32, 32), 0))
+    assert len(items) == 4
+    assert calls == [(0, 0, 32, 32)]
+
+
+def test_blocks_are_built_lazily_and_cached():
+    calls = []
+    lod = LodProvider(checker_provider(calls), 64, limits=(0, 0, 512, 512))
+    items = list(lod.get_items(pygame.FRect(0, 0, 256, 256), 2))
+    # one block of 64 pixels covers 256 world units at level 2
+    assert [pos for pos, _ in items] == [(0, 0)]
+    block = items[0][1]
+    assert block.get_size() == (64, 64)
+    assert block.get_at((10, 10)) == pygame.Color(200, 100, 50)
+    assert len(calls) == 16
+
+    list(lod.get_items(pygame.FRect(0, 0, 256, 256), 2))
+    assert len(calls) == 16
+
+    lod.invalidate()
+    list(lod.get_items(pygame.FRect(0, 0, 256, 256), 2))
+    assert len(calls) == 32
+
+
+def test_blocks_outside_limits_are_skipped():
+    lod = LodProvider(checker_provider(), 64, limits=(0, 0, 512, 512))
+    items = list(lod.get_items(pygame.FRect(-1000, -1000, 3000, 3000), 2))
+    assert len(items) == 4
+
+
+def test_render_matches_full_detail():
+    Visor.clear_scaling_cache()
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 512, 512))
+    lod = LodProvider(checker_provider(), 64, limits=(0, 0, 512, 512))
+
+    target = pygame.Surface((100, 100))
+    level = lod.render(view, target)
+    assert level == 2
+    assert target.get_at((50, 50)) == pygame.Color(200, 100, 50)
+    assert target.get_at((99, 99)) == pygame.Color(200, 100, 50)
+
+
+def test_blocks_stay_out_of_the_scaling_cache():
+    Visor.clear_scaling_cache()
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 300, 300))
+    lod = LodProvider(checker_provider(), 64, limits=(0, 0, 512, 512), cache_size=16)
+
+    target = pygame.Surface((100, 100))
+    assert lod.render(view, target) == 1
+    assert target.get_at((99, 99)) == pygame.Color(200, 100, 50)
+    assert Visor.get_scaling_cache_info().currsize == 0
+    assert lod._get_scaled_block.cache_info().currsize == 9
@@ -0,0 +1,68 @@
+import pygame
+import pytest
+
+from pygame_visor import Visor, VisorMode, OcclusionMap
+
+
+def test_occlusion_map():
+    with pytest.raises(ValueError):
+        OcclusionMap((100, 100), 0)
+    coverage = OcclusionMap((100, 100), 10)
+    assert not coverage.is_covered(pygame.Rect(0, 0, 10, 10))
+    assert coverage.is_covered(pygame.Rect(200, 200, 10, 10))
+
+    # only tiles lying completely inside are covered
+    coverage.cover(pygame.Rect(5, 5, 30, 30))
+    assert coverage.is_covered(pygame.Rect(12, 12, 18, 18))
+    assert not coverage.is_covered(pygame.Rect(5, 5, 10, 10))
+
+    # tiles at the screen edge count once the rect reaches the edge
+    coverage.cover(pygame.Rect(95, -10, 20, 110))
+    assert not coverage.is_covered(pygame.Rect(95, 0, 5, 5))
+    coverage.cover(pygame.Rect(85, -10, 20, 120))
+    assert coverage.is_covered(pygame.Rect(92, 0, 8, 100))
+
+    coverage.clear()
+    assert not coverage.is_covered(pygame.Rect(12, 12, 18, 18))
+
+
+def test_render_skips_hidden_items():
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    hidden = pygame.Surface((10, 10))
+    hidden.fill('red')
+    sprite = pygame.Surface((10, 10), pygame.SRCALPHA)
+    sprite.fill('blue')
+    wall = pygame.Surface((50, 50))
+    wall.fill('gray')
+    glass = pygame.Surface((50, 50), pygame.SRCALPHA)
+    glass.fill((255, 255, 255, 40))
+
+    view.render(target, [
+        ((10, 10), hidden),
+        ((60, 10), hidden),
+        ((70, 10), sprite),
+        ((0, 0), wall),
+        ((50, 0), glass),
+    ], occlusion=True)
+    assert view.stats.culled == 1
+    assert view.stats.blits == 4
+    assert target.get_at((25, 25)) == pygame.Color('gray')
+    assert target.get_at((125, 25)) != target.get_at((145, 25))
+
+    # flagged per pixel alpha surfaces occlude too, sprites in front are still drawn
+    view.stats.reset()
+    Visor.set_opaque(glass)
+    view.render(target, [((70, 10), hidden), ((50, 0), glass), ((70, 10), sprite)], occlusion=True)
+    assert view.stats.culled == 1
+    Visor.set_opaque(glass, False)
+    assert not Visor.is_opaque(glass)
+
+
+def test_rotated_items_do_not_occlude():
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    small = pygame.Surface((10, 10))
+    wall = pygame.Surface((50, 50))
+    view.render(target, [((20, 20), small), ((0, 0), wall, 45)], occlusion=True)
+    assert view.stats.culled == 0
@@ -0,0 +1,63 @@
+import pygame
+
+from pygame_visor import Visor, VisorMode, ParallaxStack
+
+
+def make_tile(color):
+    tile = pygame.Surface((10, 10))
+    tile.fill(color)
+    return tile
+
+
+def test_layers_follow_camera_by_scroll():
+    target = pygame.Surface((200, 200))
+    camera = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    stack = ParallaxStack(camera)
+    sky = stack.add([((45, 45), make_tile('blue'))], scroll=0.0, zoom=0.0, background='black')
+    hills = stack.add([((0, 0), make_tile('green'))], scroll=0.5)
+    assert len(stack) == 2
+    assert list(stack) == [sky, hills]
+
+    assert stack.draw(target) == 2
+    assert target.get_at((95, 95)) == pygame.Color('blue')
+    assert target.get_at((15, 5)) == pygame.Color('green')
+
+    camera.move_to((60, 50))  # 10 units to the right
+    assert stack.draw(target) == 0
+    assert hills.visor.region.center == (55, 50)
+    # the sky didn't move, the hills moved by half the camera movement
+    assert target.get_at((95, 95)) == pygame.Color('blue')
+    assert target.get_at((15, 5)) == pygame.Color('black')
+    assert target.get_at((5, 5)) == pygame.Color('green')
+
+
+def test_zoom_factor():
+    target = pygame.Surface((200, 200))
+    camera = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    stack = ParallaxStack(camera)
+    fixed = stack.add([((0, 0), make_tile('blue'))], scroll=0.0, zoom=0.0)
+    half = stack.add([((0, 0), make_tile('green'))], zoom=0.5)
+    stack.draw(target)
+
+    camera.region.scale_by_ip(4, 4)
+    assert stack.draw(target) == 1
+    assert fixed.visor.region.size == (100, 100)
+    assert half.visor.region.size == (200, 200)
+
+    stack.remove(fixed)
+    assert list(stack) == [half]
+
+
+def test_layers_dont_jump_on_rebase():
+    camera = Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100), chunk_size=100)
+    stack = ParallaxStack(camera)
+    hills = stack.add(scroll=0.5)
+
+    camera.move_to((190, 50))
+    assert camera.origin == (0, 0)
+    hills.sync()
+    before = hills.visor.region.center
+    camera.move_to((210, 50))
+    assert camera.origin == (2, 0)
+    hills.sync()
+    assert hills.visor.region.center == (before[0] + 10, before[1])
@@ -0,0 +1,73 @@
+import pytest
+import pygame
+
+from pygame_visor import Visor, VisorMode, PickIndex
+
+
+def make_view():
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    return target, view
+
+
+def test_pick_requires_enabling():
+    _, view = make_view()
+    with pytest.raises(RuntimeError):
+        view.pick((0, 0))
+    with pytest.raises(ValueError):
+        PickIndex(0)
+
+
+def test_pick_returns_hits_in_draw_order():
+    target, view = make_view()
+    index = view.enable_picking(cell_size=32)
+    floor = pygame.Surface((50, 50))
+    unit = pygame.Surface((10, 10))
+    view.render(target, [((0, 0), floor), ((500, 500), floor)])
+    view.render(target, [((20, 20), unit)])
+
+    # the item outside the render area is not indexed
+    assert len(index) == 2
+    hits = view.pick((45, 45))
+    assert [hit.order for hit in hits] == [0, 1]
+    assert hits[-1].item == ((20, 20), unit)
+    assert hits[-1].rect == pygame.Rect(40, 40, 20, 20)
+    assert [hit.order for hit in view.pick((80, 80))] == [0]
+    assert view.pick((150, 150)) == []
+
+    assert [hit.order for hit in view.pick_rect((50, 50, 100, 100))] == [0, 1]
+    assert [hit.order for hit in view.pick_rect((0, 0, 30, 30))] == [0]
+
+    index.clear()
+    assert view.pick((45, 45)) == []
+
+
+def test_pick_pixel_accurate():
+    target, view = make_view()
+    view.enable_picking()
+    ring = pygame.Surface((20, 20), pygame.SRCALPHA)
+    pygame.draw.circle(ring, 'white', (10, 10), 10, 3)
+    view.render(target, [((10, 10), ring)])
+
+    assert len(view.pick((40, 40))) == 1
+    assert view.pick((40, 40), pixel=True) == []
+    assert len(view.pick((22, 40), pixel=True)) == 1
+    assert view.pick_rect((30, 30, 20, 20), pixel=True) == []
+    assert len(view.pick_rect((15, 30, 20, 20), pixel=True)) == 1
+
+    # masks are cached per surface and scaled size
+    PickIndex._get_mask.cache_clear()
+    view.pick((22, 40), pixel=True)
+    view.pick((22, 40), pixel=True)
+    assert PickIndex._get_mask.cache_info().misses == 1
+
+
+def test_pick_rotated_item():
+    target, view = make_view()
+    view.enable_picking()
+    bar = pygame.Surface((40, 4))
+    view.render(target, [((30, 48), bar, 90)])
+
+    # the bar stands upright around (50, 50) world, (100, 100) on screen
+    assert len(view.pick((100, 65), pixel=True)) == 1
+    assert view.pick((70, 100), pixel=True) == []
@@ -0,0 +1,101 @@
+import pygame
+
+from pygame_visor import Visor, VisorMode, DynamicResolution
+
+
+class FakeTimer:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.render_ms = 0.0
+        self._started = False
+
+    def __call__(self) -> float:
+        # every second call is the end of a render
+        if self._started:
+            self.now += self.render_ms / 1000
+        self._started = not self._started
+        return self.now
+
+
+def make_tiles():
+    tile = pygame.Surface((10, 10))
+    tile.fill('red')
+    return [((x, y), tile) for x in range(0, 100, 20) for y in range(0, 100, 20)]
+
+
+def test_scale_follows_the_budget():
+    timer = FakeTimer()
+    view = Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100))
+    dynres = DynamicResolution(view, budget_ms=10, min_scale=0.5, step=0.25, cooldown=5, timer=timer)
+    target = pygame.Surface((200, 200))
+
+    timer.render_ms = 20
+    for _ in range(5):
+        dynres.render(target, make_tiles())
+    assert dynres.scale == 0.75
+    for _ in range(5):
+        dynres.render(target, make_tiles())
+    assert dynres.scale == 0.5
+    for _ in range(20):
+        dynres.render(target, make_tiles())
+    assert dynres.scale == 0.5
+
+    # within the hysteresis band nothing changes
+    timer.render_ms = 9
+    for _ in range(50):
+        dynres.render(target, make_tiles())
+    assert dynres.scale == 0.5
+
+    timer.render_ms = 2
+    for _ in range(50):
+        dynres.render(target, make_tiles())
+    assert dynres.scale == 1.0
+
+
+def test_renders_upscaled():
+    view = Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100))
+    dynres = DynamicResolution(view, min_scale=0.5, max_scale=0.5)
+    target = pygame.Surface((200, 200))
+    dynres.render(target, make_tiles())
+
+    assert dynres.scale == 0.5
+    assert target.get_at((10, 10)) == pygame.Color('red')
+    assert target.get_at((30, 30)) == pygame.Color('black')
+    assert target.get_at((50, 50)) == pygame.Color('red')
+
+
+def test_zoom_detection():
+    view = Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100))
+    dynres = DynamicResolution(view, min_scale=0.5, max_scale=0.5)
+    target = pygame.Surface((200, 200))
+    dynres.render(target, make_tiles())
+    assert not dynres.is_zooming()
+
+    view.scale_by_at(0.5)
+    assert dynres.is_zooming()
+    dynres.render(target, make_tiles())
+    assert not dynres.is_zooming()
+
+
+def test_upscales_into_the_render_area_only(monkeypatch):
+    cleared = []
+    monkeypatch.setattr(Visor, 'clear_scaling_cache', lambda: cleared.append(True))
+    view = Visor(VisorMode.RegionLetterbox, (300, 200), region=(0, 0, 100, 100))
+    dynres = DynamicResolution(view, min_scale=0.5, max_scale=0.5)
+    target = pygame.Surface((300, 200))
+    target.fill('white')
+
+    # drawn over the existing content, like at full scale
+    dynres.render(target, make_tiles())
+    assert target.get_at((10, 10)) == pygame.Color('white')
+    assert target.get_at((60, 10)) == pygame.Color('red')
+    assert target.get_at((80, 30)) == pygame.Color('white')
+
+    # the background only fills the render area, the letterbox bars are kept
+    dynres.background = 'black'
+    dynres.scale = 0.75
+    dynres.render(target, make_tiles())
+    assert target.get_at((10, 10)) == pygame.Color('white')
+    assert target.get_at((60, 10)) == pygame.Color('red')
+    assert target.get_at((80, 30)) == pygame.Color('black')
+    assert cleared == []
@@ -0,0 +1,101 @@
+import pygame
+
+from pygame_visor import Visor, VisorMode, VisorGroup
+
+
+class Block(pygame.sprite.Sprite):
+    def __init__(self, color, pos, size=(10, 10), layer=0) -> None:
+        self._layer = layer
+        super().__init__()
+        self.image = pygame.Surface(size)
+        self.image.fill(color)
+        self.rect = self.image.get_rect(topleft=pos)
+
+
+def test_draw_scales_and_culls():
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    inside = Block('red', (10, 10))
+    outside = Block('blue', (500, 500))
+    group = VisorGroup(inside, outside)
+
+    assert group.draw(target, view) == [pygame.Rect(0, 0, 200, 200)]
+    assert target.get_at((25, 25)) == pygame.Color('red')
+    assert target.get_at((19, 19)) == pygame.Color('black')
+    assert group.spritedict[outside] is VisorGroup._undrawn
+    assert group.spritedict[inside] == pygame.Rect(20, 20, 20, 20)
+
+    # shared scaling cache
+    group.draw(target, view)
+    assert Visor.get_scaling_cache_info().hits == 1
+
+
+def test_layers_are_respected():
+    target = pygame.Surface((100, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    top = Block('red', (0, 0), layer=2)
+    bottom = Block('blue', (0, 0), layer=1)
+    group = VisorGroup(top, bottom)
+    group.draw(target, view)
+    assert target.get_at((5, 5)) == pygame.Color('red')
+
+
+def test_dirty_rects():
+    target = pygame.Surface((100, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    still = Block('red', (0, 0))
+    moving = Block('blue', (50, 50))
+    removed = Block('green', (80, 0))
+    group = VisorGroup(still, moving, removed)
+    group.draw(target, view)
+
+    # nothing changed
+    assert group.draw(target, view) == []
+
+    moving.rect.x += 5
+    removed.kill()
+    dirty = group.draw(target, view)
+    assert sorted(map(tuple, dirty)) == [(50, 50, 15, 10), (80, 0, 10, 10)]
+
+    still.image = still.image.copy()
+    assert group.draw(target, view) == [pygame.Rect(0, 0, 10, 10)]
+
+    # moving the visor changes everything
+    view.move_to((60, 60))
+    assert group.draw(target, view) == [pygame.Rect(0, 0, 100, 100)]
+
+
+def test_drawn_sprites_are_picked():
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    view.enable_picking(cell_size=32)
+    bottom = Block('blue', (10, 10), size=(30, 30))
+    top = Block('red', (20, 20))
+    outside = Block('green', (500, 500))
+    group = VisorGroup(bottom, top, outside)
+    group.draw(target, view)
+
+    hits = view.pick((45, 45))
+    assert [hit.item for hit in hits] == [((10, 10), bottom.image), ((20, 20), top.image)]
+    assert hits[-1].rect == pygame.Rect(40, 40, 20, 20)
+    assert len(view.pick_index) == 2
+
+    # the same entries with the visor doing the drawing
+    view.pick_index.clear()
+    view.rotation = 90
+    group.draw(target, view)
+    assert len(view.pick_index) == 2
+    hits = view.pick(view.world_to_screen((25, 25)))
+    assert [hit.item for hit in hits] == [((10, 10), bottom.image), ((20, 20), top.image)]
+
+
+def test_draw_with_occlusion():
+    target = pygame.Surface((100, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    hidden = Block('blue', (10, 10))
+    cover = Block('red', (0, 0), size=(50, 50))
+    group = VisorGroup(hidden, cover)
+    group.draw(target, view, occlusion=True)
+    assert target.get_at((15, 15)) == pygame.Color('red')
+    assert view.stats.culled == 1
@@ -1,9 +1,12 @@
+from fractions import Fraction
 import math
+import warnings
 
+import pygame
 import pytest
 from pygame.typing import RectLike
 
-from pygame_visor import Visor, VisorMode
+from pygame_visor import Animation, Visor, VisorMode
 from pygame_visor.types import ScreenPos, WorldPos, Limits, ScreenSize
 
 
@@ -208,3 +211,491 @@ def test_scale_by_at(
     view.scale_by_at(factor, world_pos)
     assert tuple(view.region) == expected_region
     assert tuple(view.region.center) == expected_center
+
+
+@pytest.mark.parametrize('source_flags,source_depth', [
+    (0, 24),
+    (0, 32),
+    (pygame.SRCALPHA, 32),
+])
+def test_scaled_surfaces_match_destination_format(source_flags: int, source_depth: int):
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((200, 200), 0, 32)
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+
+    source = pygame.Surface((10, 10), source_flags, source_depth)
+    source.fill((10, 20, 30))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        view.render(target, [((0, 0), source)])
+
+    scaled = view._get_scaled_surface(source, 20, 20, Visor._surface_format(target))
+    assert Visor._surface_format(scaled) == Visor._surface_format(target)
+    assert bool(scaled.get_flags() & pygame.SRCALPHA) == bool(source_flags & pygame.SRCALPHA)
+    assert target.get_at((5, 5)) == pygame.Color(10, 20, 30)
+
+
+def test_unconverted_sources_are_reported():
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((200, 200), 0, 32)
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+
+    converted = pygame.Surface((10, 10), 0, 32)
+    unconverted = pygame.Surface((10, 10), 0, 24)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        view.render(target, [((0, 0), converted), ((10, 0), unconverted)])
+
+    stats = Visor.get_scaling_cache_stats()
+    assert stats.misses == 2
+    assert stats.unconverted == 1
+
+
+def test_unscaled_sources_are_converted_and_reported():
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((100, 100), 0, 32)
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    unconverted = pygame.Surface((10, 10), 0, 24)
+    unconverted.fill('red')
+
+    with pytest.warns(RuntimeWarning):
+        view.render(target, [((0, 0), unconverted)])
+    view.render(target, [((0, 0), unconverted)])
+    assert Visor.get_scaling_cache_stats().unconverted == 1
+    assert target.get_at((5, 5)) == pygame.Color('red')
+
+    # warned again after clearing the cache
+    Visor.clear_scaling_cache()
+    with pytest.warns(RuntimeWarning):
+        view.render(target, [((0, 0), unconverted)])
+
+
+def test_colorkey_is_kept_on_scaled_surfaces():
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((200, 200), 0, 32)
+    target.fill('white')
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+
+    source = pygame.Surface((10, 10), 0, 32)
+    source.fill('magenta')
+    source.fill('red', (0, 0, 5, 10))
+    source.set_colorkey('magenta')
+    view.render(target, [((0, 0), source)])
+
+    assert target.get_at((2, 2)) == pygame.Color('red')
+    assert target.get_at((18, 2)) == pygame.Color('white')
+
+
+def test_transform_version():
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 100, 100))
+    version = view.transform_version
+    assert view.transform_version == version
+
+    view.move_to((50, 50))
+    assert view.transform_version == version
+
+    view.move_to((60, 50))
+    assert view.transform_version == version + 1
+
+    # direct changes to the region are noticed as well
+    view.region.scale_by_ip(2, 2)
+    assert view.transform_version == version + 2
+
+    view.update_screen((200, 100))
+    assert view.transform_version == version + 3
+
+
+def test_lerp_to_snaps_and_settles():
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 100, 100))
+    assert view.is_settled()
+
+    view.lerp_to((100, 100), 0.5)
+    assert not view.is_settled()
+    assert tuple(view.region.center) == (75, 75)
+
+    for _ in range(20):
+        view.lerp_to((100, 100), 0.5)
+    assert view.is_settled(epsilon=0.0)
+    assert tuple(view.region.center) == (100, 100)
+
+    version = view.transform_version
+    view.lerp_to((100, 100), 0.5)
+    assert view.transform_version == version
+
+
+def test_lerp_to_settles_at_limits():
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 100, 100), limits=(0, 0, 200, 200))
+    for _ in range(50):
+        view.lerp_to((1000, 1000), 0.5)
+    assert tuple(view.region) == (100, 100, 100, 100)
+    assert view.is_settled()
+
+
+def test_render_budget_defers_misses():
+    Visor.clear_scaling_cache()
+    Visor.update_scaling_cache(200)
+    try:
+        target = pygame.Surface((200, 200), 0, 32)
+        view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+        tiles = []
+        for n in range(100):
+            tile = pygame.Surface((10, 10), 0, 32)
+            tile.fill('red')
+            tiles.append(((n % 10 * 10, n // 10 * 10), tile))
+
+        # no budget at all, nothing was scaled before
+        assert view.render(target, tiles, budget_ms=0) == 100
+        assert target.get_at((5, 5)) == pygame.Color('black')
+
+        assert view.render(target, tiles, budget_ms=1000) == 0
+        assert target.get_at((5, 5)) == pygame.Color('red')
+
+        # scaled versions are reused, even without a budget
+        assert view.render(target, tiles, budget_ms=0) == 0
+
+        # zooming in, the previous zoom level gets stretched
+        view.region.scale_by_ip(0.5, 0.5)
+        target.fill('black')
+        assert view.render(target, tiles, budget_ms=0) == 100
+        assert target.get_at((100, 100)) == pygame.Color('red')
+        assert Visor._recent_scaled[tiles[0][1]][0] == (20, 20)
+    finally:
+        Visor.update_scaling_cache(20)
+
+
+def test_render_budget_uses_the_scaling_cache():
+    Visor.clear_scaling_cache()
+    Visor.update_scaling_cache(200)
+    try:
+        target = pygame.Surface((200, 200), 0, 32)
+        view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+        tiles = []
+        for n in range(100):
+            tile = pygame.Surface((10, 10), 0, 32)
+            tile.fill('red')
+            tiles.append(((n % 10 * 10, n // 10 * 10), tile))
+
+        view.render(target, tiles)
+        target.fill('black')
+        misses = Visor.get_scaling_cache_info().misses
+
+        # everything is cached already, nothing needs to be deferred
+        assert view.render(target, tiles, budget_ms=0) == 0
+        assert target.get_at((5, 5)) == pygame.Color('red')
+        assert target.get_at((195, 195)) == pygame.Color('red')
+        assert Visor.get_scaling_cache_info().misses == misses
+    finally:
+        Visor.update_scaling_cache(20)
+
+
+@pytest.mark.parametrize('mode', [VisorMode.RegionLetterbox, VisorMode.RegionExpand])
+@pytest.mark.parametrize('rotation', [0, 30, 90, 180, -45])
+def test_rotated_coordinate_roundtrip(mode: VisorMode, rotation: float):
+    view = Visor(mode, (400, 300), region=(10, 20, 100, 100), rotation=rotation)
+    for world_pos in [(60, 70), (30, 40), (100, 110)]:
+        screen_pos = view._world_to_screen(world_pos)
+        back = view.screen_to_world(screen_pos)
+        if back is None:
+            continue
+        assert math.isclose(back.x, world_pos[0], abs_tol=1e-4)
+        assert math.isclose(back.y, world_pos[1], abs_tol=1e-4)
+
+    # the center stays in place
+    assert view.world_to_screen(view.region.center) == (200, 150)
+
+
+def test_rotated_world_to_screen():
+    view = Visor(VisorMode.RegionLetterbox, (100, 100), region=(0, 0, 100, 100), rotation=90)
+    # the world appears rotated clockwise, what was right of the center is now below it
+    assert view.world_to_screen((75, 50)) == (50, 75)
+    assert view.world_to_screen((50, 25)) == (75, 50)
+
+
+@pytest.mark.parametrize('rotation,expected_bounding_box', [
+    [0, (0, 0, 200, 100)],
+    [90, (50, -50, 100, 200)],
+    [180, (0, 0, 200, 100)],
+])
+def test_rotated_bounding_box(rotation: float, expected_bounding_box: RectLike):
+    view = Visor(VisorMode.RegionLetterbox, (200, 100), region=(0, 0, 200, 100), rotation=rotation)
+    for a, b in zip(view.get_bounding_box(), expected_bounding_box):
+        assert math.isclose(a, b, abs_tol=1e-4)
+
+
+def test_render_rotated_items():
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((100, 100), 0, 32)
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 50, 50))
+
+    bar = pygame.Surface((20, 4), 0, 32)
+    bar.fill('red')
+    view.render(target, [((15, 23), bar, 90)])
+
+    # 40x8 on screen, rotated to be vertical around the center (50, 50)
+    assert target.get_at((50, 50)) == pygame.Color('red')
+    assert target.get_at((50, 35)) == pygame.Color('red')
+    assert target.get_at((35, 50)) == pygame.Color('black')
+
+    # the rotated version is cached
+    view.render(target, [((15, 23), bar, 90.2)])
+    info = Visor._get_rotated_surface.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
+
+
+def test_render_with_camera_rotation():
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((100, 100), 0, 32)
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100), rotation=90)
+
+    tile = pygame.Surface((10, 10), 0, 32)
+    tile.fill('red')
+    view.render(target, [((70, 45), tile)])
+    # right of the center -> below the center
+    assert target.get_at((50, 75)) == pygame.Color('red')
+    assert target.get_at((75, 50)) == pygame.Color('black')
+
+
+def test_draw_rect_in_world_coordinates():
+    target = pygame.Surface((200, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    # active area is (50, 0, 100, 100), scaling factor 1
+    rect = view.draw_rect(target, 'red', (10, 10, 20, 20))
+    assert rect == pygame.Rect(60, 10, 20, 20)
+    assert target.get_at((60, 10)) == pygame.Color('red')
+    assert target.get_at((59, 10)) == pygame.Color('black')
+
+
+def test_draw_is_clipped_to_the_active_area():
+    target = pygame.Surface((200, 100))
+    target.set_clip((0, 0, 120, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    view.draw_line(target, 'red', (-50, 50), (150, 50), 3)
+    assert target.get_at((49, 50)) == pygame.Color('black')
+    assert target.get_at((50, 50)) == pygame.Color('red')
+    assert target.get_at((119, 50)) == pygame.Color('red')
+    # the previous clip is kept and restored
+    assert target.get_at((120, 50)) == pygame.Color('black')
+    assert target.get_clip() == pygame.Rect(0, 0, 120, 100)
+
+
+def test_draw_primitives_scaled():
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+    view.draw_circle(target, 'red', (50, 50), 10)
+    assert target.get_at((100, 100)) == pygame.Color('red')
+    assert target.get_at((100, 81)) == pygame.Color('red')
+    assert target.get_at((100, 78)) == pygame.Color('black')
+
+    view.draw_polygon(target, 'blue', [(0, 0), (10, 0), (0, 10)])
+    assert target.get_at((2, 2)) == pygame.Color('blue')
+    assert target.get_at((18, 18)) == pygame.Color('black')
+
+    view.draw_lines(target, 'green', False, [(0, 90), (50, 90), (50, 95)])
+    assert target.get_at((50, 180)) == pygame.Color('green')
+    assert target.get_at((100, 185)) == pygame.Color('green')
+
+
+def test_draw_rect_rotated():
+    target = pygame.Surface((100, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100), rotation=90)
+    view.draw_rect(target, 'red', (60, 45, 30, 10))
+    # right of the center -> below the center, and vertical
+    assert target.get_at((50, 75)) == pygame.Color('red')
+    assert target.get_at((56, 75)) == pygame.Color('black')
+    assert target.get_at((75, 50)) == pygame.Color('black')
+
+
+def test_draw_text_is_cached():
+    Visor._render_text.cache_clear()
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+
+    rect = view.draw_text(target, 'hello', (10, 10), 'white')
+    assert rect.topleft == (20, 20)
+    assert target.get_bounding_rect().colliderect(rect)
+
+    view.draw_texts(target, [('hello', (10, 30)), ('world', (10, 50))], 'white')
+    info = Visor.get_text_cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_draw_text_anchor_and_zoom():
+    Visor._render_text.cache_clear()
+    target = pygame.Surface((200, 200))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 100, 100))
+
+    rect = view.draw_text(target, 'label', (50, 50), 'white', anchor='center')
+    assert rect.center == (100, 100)
+
+    small = view.draw_text(target, 'label', (50, 50), 'white', size=10, scale_with_zoom=True)
+    view.region.scale_by_ip(0.5, 0.5)
+    large = view.draw_text(target, 'label', (50, 50), 'white', size=10, scale_with_zoom=True)
+    assert large.height > small.height
+
+    # small zoom changes stay in the same size bucket
+    view.region.scale_by_ip(1.01, 1.01)
+    view.draw_text(target, 'label', (50, 50), 'white', size=10, scale_with_zoom=True)
+    assert Visor.get_text_cache_info().misses == 3
+
+
+def test_interpolated_fixed_timestep():
+    view = Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100))
+    # without a tick, the current state is used
+    assert view.interpolated(0.5).region == view.region
+
+    view.tick()
+    view.move_to((150, 50))
+    view.region.scale_by_ip(2, 2)
+    view.rotation = 350
+
+    halfway = view.interpolated(0.5)
+    assert halfway is view.interpolated(0.5)
+    assert halfway.region.center == (100, 50)
+    assert halfway.region.size == (150, 150)
+    assert halfway.rotation == 355
+    assert halfway.get_bounding_box().contains(pygame.FRect(40, -10, 120, 120))
+    assert view.interpolated(1.0).region == view.region
+
+    view.rotation = 0
+    view.tick()
+    view.rotation = 20
+    assert view.interpolated(0.25).rotation == 5
+    assert tuple(view.interpolated(0.0).screen_to_world((100, 100))) == pytest.approx(view.region.center)
+
+
+def test_floating_origin():
+    with pytest.raises(ValueError):
+        Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100), chunk_size=0)
+    view = Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100), chunk_size=1000)
+
+    far = ((5_000_000, -3_000_000), (500.25, 250.5))
+    view.move_to(far)
+    assert view.origin == (5_000_000, -3_000_000)
+    assert view.region.center == (500.25, 250.5)
+    assert view.world_to_screen(far) == (100, 100)
+    assert view.world_to_screen(((5_000_000, -3_000_000), (510.25, 250.5))) == (120, 100)
+    assert view.to_chunk(view.screen_to_world((100, 100))) == far
+
+    # small moves across a chunk border don't re-base
+    view.move_to(((5_000_001, -3_000_000), (100, 250.5)))
+    assert view.origin == (5_000_000, -3_000_000)
+    assert view.region.centerx == 1100
+    view.move_to(((5_000_002, -3_000_000), (100, 250.5)))
+    assert view.origin == (5_000_002, -3_000_000)
+    assert view.region.centerx == 100
+
+    target = pygame.Surface((200, 200))
+    tile = pygame.Surface((10, 10))
+    tile.fill('red')
+    view.render(target, [(((5_000_002, -3_000_000), (100, 250.5)), tile)])
+    assert target.get_at((105, 105)) == pygame.Color('red')
+
+    with pytest.raises(ValueError):
+        Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100)).to_local(far)
+
+
+def test_plain_positions_of_other_numeric_types():
+    plain = (Fraction(10), Fraction(20))
+    view = Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100))
+    view.move_to(plain)
+    assert view.region.center == (10, 20)
+
+    view = Visor(VisorMode.RegionLetterbox, (200, 200), region=(0, 0, 100, 100), chunk_size=1000)
+    view.move_to(plain)
+    assert view.world_to_screen(plain) == (100, 100)
+    target = pygame.Surface((200, 200))
+    tile = pygame.Surface((10, 10))
+    tile.fill('red')
+    view.render(target, [(plain, tile)])
+    assert target.get_at((105, 105)) == pygame.Color('red')
+
+
+def test_rebase_shifts_limits_and_targets():
+    view = Visor(
+        VisorMode.RegionLetterbox, (200, 200), region=(-50, -50, 100, 100),
+        limits=(-10_000, -10_000, 10_000, 10_000), chunk_size=1000,
+    )
+    version = view.transform_version
+    view.tick()
+    view.lerp_to((5000, 0), 0.5)
+    assert view.origin == (2, 0)
+    assert view.region.centerx == 500
+    assert view.limits == (-12_000, -10_000, 8000, 10_000)
+    assert view._lerp_target == (3000, 0)
+    assert view.interpolated(0.0).region.centerx == -2000
+    assert view.transform_version != version
+
+
+def make_gradient_sprite(size=(16, 16)):
+    sprite = pygame.Surface(size, pygame.SRCALPHA)
+    w, h = size
+    for y in range(h):
+        for x in range(w):
+            sprite.set_at((x, y), (x * 255 // w, y * 255 // h, 200, (x + y) * 255 // (w + h)))
+    return sprite
+
+
+@pytest.mark.parametrize('zoom', [1.0, 2.0, 0.5])
+def test_premultiplied_matches_regular_render(zoom):
+    Visor.clear_scaling_cache()
+    sprite = make_gradient_sprite()
+    opaque = pygame.Surface((8, 8))
+    opaque.fill('orange')
+    # surface alpha and colorkey are ignored by BLEND_PREMULTIPLIED, drawn the regular way
+    faded = make_gradient_sprite()
+    faded.set_alpha(100)
+    keyed = make_gradient_sprite()
+    keyed.set_colorkey(keyed.get_at((0, 0)))
+    items = [((0, 0), sprite), ((10, 5), sprite), ((4, 4), opaque), ((30, 0), faded), ((0, 30), keyed)]
+
+    expected = pygame.Surface((100, 100))
+    expected.fill((30, 60, 90))
+    result = expected.copy()
+    view = Visor(VisorMode.RegionLetterbox, expected.get_rect(), region=(0, 0, 100 / zoom, 100 / zoom))
+    view.render(expected, items)
+    view.render(result, items, premultiplied=True)
+
+    diff = max(
+        abs(a - b)
+        for a, b in zip(pygame.image.tobytes(expected, 'RGB'), pygame.image.tobytes(result, 'RGB'))
+    )
+    assert diff <= 2
+
+
+def test_premultiplied_sources_are_cached():
+    Visor.clear_scaling_cache()
+    sprite = make_gradient_sprite()
+    target = pygame.Surface((100, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 50, 50))
+    view.render(target, [((0, 0), sprite)] * 3, premultiplied=True)
+    view.region.scale_by_ip(0.5, 0.5)
+    view.render(target, [((0, 0), sprite)], premultiplied=True)
+
+    # scaled through the regular cache, every zoom level premultiplied once
+    assert Visor.get_scaling_cache_info().misses == 2
+    assert Visor.get_scaling_cache_info().hits == 2
+    assert len(Visor._premultiplied) == 2
+    # the source itself is left untouched
+    assert sprite.get_at((15, 15)) == pygame.Color(239, 239, 200, 239)
+
+    Visor.clear_scaling_cache()
+    assert len(Visor._premultiplied) == 0
+
+
+def test_premultiplied_respects_budget_and_animations():
+    Visor.clear_scaling_cache()
+    target = pygame.Surface((100, 100))
+    view = Visor(VisorMode.RegionLetterbox, target.get_rect(), region=(0, 0, 50, 50))
+    sprites = [make_gradient_sprite() for _ in range(3)]
+    items = [((0, 0), sprite) for sprite in sprites]
+    assert view.render(target, items, budget_ms=0, premultiplied=True) == 3
+    assert len(Visor._premultiplied) == 0
+    assert view.render(target, items, budget_ms=1000, premultiplied=True) == 0
+    assert len(Visor._premultiplied) == 3
+
+    sheet = pygame.Surface((40, 20), pygame.SRCALPHA)
+    sheet.fill((255, 0, 0, 128))
+    animation = Animation.from_grid(sheet, (20, 20))
+    view.render(target, [animation.item((0, 0), 0)], premultiplied=True)
+    view.render(target, [animation.item((0, 0), 100)], premultiplied=True)
+    assert Visor._get_scaled_frames.cache_info().misses == 1